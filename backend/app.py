@@ -2,61 +2,90 @@
 from flask import Flask, jsonify
 from dotenv import load_dotenv
 from bson import ObjectId
+from flask_jwt_extended import jwt_required, get_jwt_identity
 import os
 
 # Import extensions
-from extentions import mongo, jwt, init_cors
+from extentions import mongo, jwt, init_mongo, init_cors, init_indexes, DB_UNAVAILABLE
+from tasks import init_tasks
 
 # Load environment variables
 load_dotenv()
 
-# ----------------------------
-# Initialize Flask app
-# ----------------------------
-app = Flask(__name__)
-app.config["MONGO_URI"] = os.getenv("MONGO_URI", "mongodb://localhost:27017/explore_karnataka")
-app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "supersecretkey123")
+# Route groups let the CPU-bound image path and the IO-bound API paths run in
+# separately tuned server pools (see gunicorn.conf.py). "all" serves everything.
+ROUTE_GROUPS = ("all", "api", "image")
+
+
+def register_blueprints(app, route_group="all"):
+    if route_group in ("all", "image"):
+        # Imported lazily: this pulls in TensorFlow, which the API pool never needs
+        from routes.image_recognition_routes import image_bp
+        app.register_blueprint(image_bp, url_prefix="/api/image")
+
+    if route_group in ("all", "api"):
+        from routes.auth import auth_bp
+        from routes.attractions import attractions_bp
+        from routes.festivals import festivals_bp
+        from routes.analytics import analytics_bp
+        from routes.itineraries import itinerary_bp
+        from routes.recommendations import recommendations_bp
+        from routes.chat import chat_bp
+        from routes.search import search_bp
+        from routes.media import media_bp
+
+        app.register_blueprint(auth_bp, url_prefix="/api/auth")
+        app.register_blueprint(attractions_bp, url_prefix="/api/attractions")
+        app.register_blueprint(festivals_bp, url_prefix="/api/festivals")
+        app.register_blueprint(analytics_bp, url_prefix="/api")
+        app.register_blueprint(itinerary_bp, url_prefix="/api/itineraries")
+        app.register_blueprint(recommendations_bp, url_prefix="/api")
+        app.register_blueprint(chat_bp, url_prefix="/api")
+        app.register_blueprint(search_bp, url_prefix="/api")
+        app.register_blueprint(media_bp)
+
+        app.add_url_rule("/api/admin/check", view_func=admin_check, methods=["GET"])
+
+    app.add_url_rule("/", view_func=home)
+    app.add_url_rule("/test_db", view_func=test_db)
 
-# Initialize extensions with app
-mongo.init_app(app)
-jwt.init_app(app)
-init_cors(app)
 
 # ----------------------------
-# Register Blueprints
+# App factory
 # ----------------------------
-from routes.auth import auth_bp
-from routes.attractions import attractions_bp
-from routes.festivals import festivals_bp
-from routes.analytics import analytics_bp
-from routes.itineraries import itinerary_bp
-from routes.image_recognition_routes import image_bp
-from routes.recommendations import recommendations_bp
-from routes.chat import chat_bp
+def create_app(route_group=None):
+    route_group = route_group or os.getenv("ROUTE_GROUP", "all")
+    if route_group not in ROUTE_GROUPS:
+        raise ValueError(f"ROUTE_GROUP must be one of {ROUTE_GROUPS}, got {route_group!r}")
 
+    app = Flask(__name__)
+    app.config["MONGO_URI"] = os.getenv("MONGO_URI", "mongodb://localhost:27017/explore_karnataka")
+    app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "supersecretkey123")
+    app.config["ROUTE_GROUP"] = route_group
 
+    # Initialize extensions with app
+    init_mongo(app)
+    jwt.init_app(app)
+    init_cors(app)
+    # Under gunicorn (preload_app) the workers do this in post_fork instead
+    if route_group != "image" and not os.getenv("DB_SETUP_IN_WORKERS"):
+        init_indexes(app)
 
-app.register_blueprint(auth_bp, url_prefix="/api/auth")
-app.register_blueprint(attractions_bp, url_prefix="/api/attractions")
-app.register_blueprint(festivals_bp, url_prefix="/api/festivals")
-app.register_blueprint(analytics_bp, url_prefix="/api")
-app.register_blueprint(itinerary_bp, url_prefix="/api/itineraries")
-app.register_blueprint(image_bp, url_prefix="/api/image")
-app.register_blueprint(recommendations_bp, url_prefix="/api")
-app.register_blueprint(chat_bp, url_prefix="/api")
-
+    register_blueprints(app, route_group)
+    init_tasks(app)
+    return app
 
 
 # ----------------------------
 # Root route
 # ----------------------------
-@app.route("/")
 def home():
     return jsonify({
         "message": "Welcome to Explore Karnataka API!",
         "routes": [
             "/api/attractions",
             "/api/festivals",
+            "/api/search",
             "/api/admin/check"
         ]
     })
@@ -64,20 +93,18 @@ def home():
 # ----------------------------
 # Test DB connection
 # ----------------------------
-@app.route("/test_db")
 def test_db():
     try:
         mongo.db.command("ping")
         return jsonify({"status": "connected", "message": "MongoDB OK!"})
+    except DB_UNAVAILABLE:
+        raise
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 # ----------------------------
 # Admin Check
 # ----------------------------
-from flask_jwt_extended import jwt_required, get_jwt_identity
-
-@app.route("/api/admin/check", methods=["GET"])
 @jwt_required()
 def admin_check():
     uid = get_jwt_identity()
@@ -89,7 +116,7 @@ def admin_check():
     return jsonify({"message": "Welcome Admin!"}), 200
 
 # ----------------------------
-# Run app
+# Run app (development server; production uses gunicorn.conf.py)
 # ----------------------------
 if __name__ == "__main__":
-    app.run(host="0.0.0.0",debug=True, port=5000)
+    create_app().run(host="0.0.0.0", debug=True, port=5000)
@@ -0,0 +1,49 @@
+"""
+Benchmark the itinerary route optimizer on random stops across Karnataka.
+
+    cd backend
+    python -m benchmarks.bench_itinerary_optimizer
+"""
+import time
+
+import numpy as np
+
+from models.itinerary_optimizer import (
+    haversine_matrix, nearest_neighbour, two_opt, route_length, optimize_route
+)
+
+# Rough bounding box of Karnataka
+LAT_RANGE = (11.5, 18.5)
+LNG_RANGE = (74.0, 78.6)
+SIZES = [10, 25, 50, 100, 200, 400]
+
+
+def random_stops(n, rng):
+    return np.column_stack([rng.uniform(*LAT_RANGE, n), rng.uniform(*LNG_RANGE, n)])
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - t0) * 1000
+
+
+def main():
+    rng = np.random.default_rng(42)
+    print(f"{'stops':>6} {'matrix ms':>10} {'nn ms':>8} {'2opt ms':>8} {'total ms':>9} "
+          f"{'nn km':>9} {'2opt km':>9} {'gain':>6}")
+    for n in SIZES:
+        coords = random_stops(n, rng)
+        dist, t_matrix = timed(haversine_matrix, coords)
+        nn, t_nn = timed(nearest_neighbour, dist)
+        opt, t_opt = timed(two_opt, dist, nn, fix_start=False)
+        _, t_total = timed(optimize_route, coords.tolist())
+
+        nn_km, opt_km = route_length(dist, nn), route_length(dist, opt)
+        gain = (nn_km - opt_km) / nn_km * 100 if nn_km else 0.0
+        print(f"{n:>6} {t_matrix:>10.2f} {t_nn:>8.2f} {t_opt:>8.2f} {t_total:>9.2f} "
+              f"{nn_km:>9.1f} {opt_km:>9.1f} {gain:>5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Connection pool behaviour under concurrent load against a local mongod.
+
+Fast catalog reads run alongside a few slow queries (server-side sleep) that
+hog connections. Each scenario reports fast-read latency, timeouts and the
+pool wait metrics collected by extentions.PoolMetrics.
+
+    mongod --dbpath /tmp/bench-db &
+    cd backend
+    python -m benchmarks.bench_mongo_pool --uri mongodb://localhost:27017
+"""
+import argparse
+import statistics
+import threading
+import time
+
+import pymongo
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from extentions import PoolMetrics
+
+SCENARIOS = [
+    # name, maxPoolSize, per-operation deadline (s) or None
+    ("pool=10, no deadline", 10, None),
+    ("pool=10, 0.5s deadline", 10, 0.5),
+    ("pool=50, no deadline", 50, None),
+    ("pool=50, 0.5s deadline", 50, 0.5),
+]
+
+
+def seed(uri, docs):
+    client = MongoClient(uri)
+    coll = client.bench_pool.attractions
+    coll.drop()
+    coll.insert_many([{"n": i, "name": f"Attraction {i}", "category": "Cultural"} for i in range(docs)])
+    coll.create_index("n")
+    client.close()
+
+
+def run_scenario(uri, pool_size, op_deadline, readers, slow_clients, duration, slow_ms):
+    metrics = PoolMetrics()
+    client = MongoClient(uri, maxPoolSize=pool_size, event_listeners=[metrics])
+    coll = client.bench_pool.attractions
+    coll.find_one()  # warm up the pool
+    metrics.reset()
+
+    latencies, timeouts = [], 0
+    lock = threading.Lock()
+    stop = time.perf_counter() + duration
+
+    def guarded(fn):
+        if op_deadline is None:
+            return fn()
+        with pymongo.timeout(op_deadline):
+            return fn()
+
+    def fast_reader(i):
+        nonlocal timeouts
+        n = i
+        while time.perf_counter() < stop:
+            t0 = time.perf_counter()
+            try:
+                guarded(lambda: coll.find_one({"n": n % 1000}))
+                with lock:
+                    latencies.append((time.perf_counter() - t0) * 1000)
+            except PyMongoError:
+                with lock:
+                    timeouts += 1
+            n += readers
+
+    def slow_query():
+        while time.perf_counter() < stop:
+            try:
+                guarded(lambda: list(coll.find({"$where": f"sleep({slow_ms}) || true"}).limit(1)))
+            except PyMongoError:
+                pass
+
+    threads = [threading.Thread(target=fast_reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=slow_query) for _ in range(slow_clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    client.close()
+
+    snap = metrics.snapshot()
+    if latencies:
+        latencies.sort()
+        p50 = statistics.median(latencies)
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+    else:
+        p50 = p99 = float("nan")
+    return {
+        "reads/s": len(latencies) / duration,
+        "p50 ms": p50,
+        "p99 ms": p99,
+        "timeouts": timeouts,
+        "wait avg ms": snap["wait_avg_ms"],
+        "wait max ms": snap["wait_max_ms"],
+        "max in use": snap["max_in_use"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--readers", type=int, default=64, help="concurrent fast-read threads")
+    parser.add_argument("--slow", type=int, default=8, help="concurrent slow-query threads")
+    parser.add_argument("--slow-ms", type=int, default=1000, help="server-side sleep per slow query")
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    seed(args.uri, 1000)
+    cols = ["reads/s", "p50 ms", "p99 ms", "timeouts", "wait avg ms", "wait max ms", "max in use"]
+    print(f"{'scenario':<24}" + "".join(f"{c:>13}" for c in cols))
+    for name, pool_size, op_deadline in SCENARIOS:
+        row = run_scenario(args.uri, pool_size, op_deadline, args.readers, args.slow, args.duration, args.slow_ms)
+        print(f"{name:<24}" + "".join(
+            f"{row[c]:>13.1f}" if isinstance(row[c], float) else f"{row[c]:>13}" for c in cols
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark search index build and query latency on synthetic catalogs.
+
+    cd backend
+    python -m benchmarks.bench_search_index
+"""
+import random
+import statistics
+import time
+
+from models.search_index import SearchIndex
+
+SIZES = [10_000, 100_000]
+QUERIES = [
+    "hampi", "murdeshwar temple", "coffee plantation", "jog fals", "heritage architecture",
+    "myso", "wildlife national park", "dasara", "beach karwar", "udupi krishna",
+]
+
+PLACES = [
+    "hampi", "murudeshwar", "coorg", "badami", "belur", "halebidu", "gokarna", "udupi",
+    "mysore", "jog", "dandeli", "chikmagalur", "kudremukh", "sringeri", "karwar", "agumbe",
+]
+WORDS = [
+    "temple", "falls", "heritage", "beach", "fort", "palace", "forest", "wildlife", "coffee",
+    "plantation", "trek", "river", "hill", "ancient", "architecture", "festival", "dasara",
+    "national", "park", "krishna", "shiva", "statue", "lake", "sunset", "caves", "ruins",
+]
+CATEGORIES = ["Cultural", "Eco", "Adventure", "Spiritual", "Wildlife", "Beach"]
+
+
+def synthetic_docs(n, rng):
+    for i in range(n):
+        if i % 5 == 0:
+            yield "festival", i, {
+                "name": f"{rng.choice(PLACES).title()} {rng.choice(WORDS).title()} Utsava {i}",
+                "location": rng.choice(PLACES).title(),
+            }
+        else:
+            yield "attraction", i, {
+                "name": f"{rng.choice(PLACES).title()} {rng.choice(WORDS).title()} {i}",
+                "category": rng.choice(CATEGORIES),
+                "tags": rng.sample(WORDS, 3),
+                "description": " ".join(rng.choices(WORDS + PLACES, k=40)),
+            }
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def main():
+    rng = random.Random(7)
+    for n in SIZES:
+        index = SearchIndex()
+        t0 = time.perf_counter()
+        for kind, doc_id, doc in synthetic_docs(n, rng):
+            index.upsert(kind, doc_id, doc)
+        build_s = time.perf_counter() - t0
+
+        timings = []
+        for _ in range(5):
+            for q in QUERIES:
+                t0 = time.perf_counter()
+                index.search(q, limit=10)
+                timings.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        index.upsert("attraction", 0, {"name": "Murudeshwar Shiva Statue", "tags": ["beach"]})
+        upsert_ms = (time.perf_counter() - t0) * 1000
+
+        print(f"{n:>7} docs: build {build_s:.2f}s, single upsert {upsert_ms:.3f}ms, "
+              f"query p50 {statistics.median(timings):.2f}ms, p95 {percentile(timings, 95):.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
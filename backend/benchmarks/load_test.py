@@ -0,0 +1,117 @@
+"""
+Concurrent load test for comparing serving modes.
+
+Start the server one way, run the test, then repeat with the other:
+
+    python app.py                                            # dev server on :5000
+    python -m benchmarks.load_test --url http://localhost:5000
+
+    ROUTE_GROUP=api gunicorn -c gunicorn.conf.py run:app    # :8000
+    ROUTE_GROUP=image gunicorn -c gunicorn.conf.py run:app  # :8001
+    python -m benchmarks.load_test --url http://localhost:8000 --image-url http://localhost:8001
+
+The API mix hits catalog reads; --image adds uploads to /api/image/predict so
+the effect of the separate image pool on API latency is visible.
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+API_PATHS = ["/api/attractions/", "/api/festivals/", "/api/search?q=hampi", "/"]
+DEFAULT_IMAGE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads", "uploaded_image.jpg")
+
+
+def get(url):
+    with urllib.request.urlopen(url, timeout=60) as resp:
+        resp.read()
+        return resp.status
+
+
+def post_image(url, path):
+    boundary = uuid.uuid4().hex
+    with open(path, "rb") as f:
+        payload = f.read()
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"load_test.jpg\"\r\n"
+        f"Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+    req = urllib.request.Request(url, data=body, method="POST",
+                                 headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    with urllib.request.urlopen(req, timeout=120) as resp:
+        resp.read()
+        return resp.status
+
+
+def run(name, calls, concurrency, duration):
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(i):
+        nonlocal errors
+        n = i
+        while time.perf_counter() < deadline:
+            call = calls[n % len(calls)]
+            n += concurrency
+            t0 = time.perf_counter()
+            try:
+                call()
+                ok = True
+            except Exception:
+                ok = False
+            elapsed = (time.perf_counter() - t0) * 1000
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    wall = time.perf_counter() - started
+
+    if not latencies:
+        print(f"{name:<8} no successful requests ({errors} errors)")
+        return
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<8} {len(latencies) / wall:>8.1f} req/s  p50 {statistics.median(latencies):>7.1f}ms  "
+          f"p95 {p95:>7.1f}ms  ok {len(latencies)}  errors {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:5000", help="base URL for API routes")
+    parser.add_argument("--image-url", help="base URL for /api/image (defaults to --url)")
+    parser.add_argument("--image", action="store_true", help="also send image predictions")
+    parser.add_argument("--image-file", default=DEFAULT_IMAGE)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per phase")
+    args = parser.parse_args()
+
+    api_calls = [lambda p=p: get(args.url + p) for p in API_PATHS]
+    predict_url = (args.image_url or args.url) + "/api/image/predict"
+
+    print(f"API routes at {args.url}, concurrency {args.concurrency}, {args.duration:.0f}s per phase")
+    run("api", api_calls, args.concurrency, args.duration)
+
+    if args.image:
+        image_calls = [lambda: post_image(predict_url, args.image_file)]
+        # API latency while the image path is saturated: with a single pool the
+        # two compete for workers, with split pools they should not
+        background = threading.Thread(
+            target=run, args=("image", image_calls, max(2, args.concurrency // 4), args.duration)
+        )
+        background.start()
+        run("api+img", api_calls, args.concurrency, args.duration)
+        background.join()
+
+
+if __name__ == "__main__":
+    main()
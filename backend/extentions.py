@@ -1,13 +1,208 @@
+from flask import jsonify, current_app
 from flask_pymongo import PyMongo
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from functools import wraps
+from pymongo import GEOSPHERE, ReadPreference, monitoring
+from pymongo.errors import ConnectionFailure, PyMongoError
+import os
+import threading
+import time
+import pymongo
 
 mongo = PyMongo()
 jwt = JWTManager()
 
+# Routes with a broad `except Exception` re-raise these first, so the handler in
+# init_mongo can answer 503 when the database is slow or unreachable
+DB_UNAVAILABLE = PyMongoError
+
+# Per-route-group query deadlines in seconds (override with MONGO_DEADLINE_<GROUP>)
+DEFAULT_DEADLINES = {
+    "catalog": 2.0,     # public attraction / festival / search reads
+    "user": 3.0,        # auth, itineraries, recommendations, chat lookups
+    "admin": 10.0,      # writes, analytics, index rebuilds
+}
+
+
 def init_cors(app):
     CORS(
         app,
         resources={r"/api/*": {"origins": "*"}},
         supports_credentials=True
     )
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Counts connection checkouts and how long requests waited for a connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.failure_reasons = {}
+            self.in_use = 0
+            self.max_in_use = 0
+            self.connections_open = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "failure_reasons": dict(self.failure_reasons),
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "connections_open": self.connections_open,
+                "wait_avg_ms": round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+            }
+
+    # checkout start / end are reported on the requesting thread
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        waited = (time.perf_counter() - getattr(self._local, "started", time.perf_counter())) * 1000
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            self.wait_total_ms += waited
+            self.wait_max_ms = max(self.wait_max_ms, waited)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+            self.failure_reasons[event.reason] = self.failure_reasons.get(event.reason, 0) + 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_open = max(0, self.connections_open - 1)
+
+    # pool lifecycle events are not tracked, but the listener must handle them
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+pool_metrics = PoolMetrics()
+
+
+def init_mongo(app):
+    """Connect with an explicitly sized pool and the timeouts used by db_deadline."""
+    app.config["MONGO_DEADLINES"] = {
+        group: float(os.getenv(f"MONGO_DEADLINE_{group.upper()}", seconds))
+        for group, seconds in DEFAULT_DEADLINES.items()
+    }
+    mongo.init_app(
+        app,
+        maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", 50)),
+        minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", 5)),
+        maxIdleTimeMS=int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 60000)),
+        maxConnecting=int(os.getenv("MONGO_MAX_CONNECTING", 4)),
+        connectTimeoutMS=int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 5000)),
+        serverSelectionTimeoutMS=int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)),
+        event_listeners=[pool_metrics],
+        # no sockets or pool threads until first use, so a preloaded gunicorn
+        # master forks workers without sharing connections
+        connect=False,
+    )
+
+    @app.errorhandler(PyMongoError)
+    def db_unavailable(e):
+        # Any operation can run past its deadline (a majority write raises
+        # WriteConcernError, not ExecutionTimeout), so ask the error itself
+        if not (e.timeout or isinstance(e, ConnectionFailure)):
+            raise e
+        app.logger.warning("Database unavailable: %s", e)
+        response = jsonify({"error": "Database busy, please retry shortly"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+
+
+def catalog(name):
+    """
+    A collection handle for public catalog reads. These can tolerate slightly
+    stale data, so they are served by a secondary when the deployment has one.
+    """
+    return mongo.db.get_collection(name, read_preference=ReadPreference.SECONDARY_PREFERRED)
+
+
+def deadline(group):
+    """
+    Context manager bounding every MongoDB operation inside it (including the
+    wait for a pool connection) by the group's deadline. Expiry raises a
+    PyMongoError with `timeout` set, which the handler in init_mongo turns
+    into a 503.
+    """
+    return pymongo.timeout(current_app.config["MONGO_DEADLINES"][group])
+
+
+def db_deadline(group):
+    """View decorator form of deadline()."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with deadline(group):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def backfill_locations(app):
+    """Give attractions stored before `location` existed a point from their other fields."""
+    from models.attraction_model import location_from_data
+
+    filled = 0
+    for doc in mongo.db.attractions.find(
+        {"location": None}, {"location": 1, "latitude": 1, "longitude": 1, "map_url": 1}
+    ):
+        try:
+            location = location_from_data(doc)
+        except ValueError as e:
+            app.logger.warning("Attraction %s has unusable coordinates: %s", doc["_id"], e)
+            continue
+        if location:
+            mongo.db.attractions.update_one({"_id": doc["_id"]}, {"$set": {"location": location}})
+            filled += 1
+    if filled:
+        app.logger.info("Backfilled location on %d attractions", filled)
+
+
+def init_indexes(app):
+    """Create the indexes the routes rely on and backfill what they index (idempotent)."""
+    try:
+        backfill_locations(app)
+        mongo.db.attractions.create_index([("location", GEOSPHERE)])
+        # search index change log; workers further behind than this just rebuild
+        mongo.db.catalog_changes.create_index("version", unique=True)
+        mongo.db.catalog_changes.create_index("at", expireAfterSeconds=7 * 24 * 3600)
+    except Exception as e:
+        app.logger.warning("Could not create indexes: %s", e)
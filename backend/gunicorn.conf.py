@@ -0,0 +1,130 @@
+# gunicorn.conf.py
+#
+# Production serving profiles. Run one pool per route group behind a reverse
+# proxy (see deploy/nginx.conf) so slow model inference never ties up the
+# workers that serve chat and database requests:
+#
+#   ROUTE_GROUP=api   gunicorn -c gunicorn.conf.py run:app    # :8000
+#   ROUTE_GROUP=image gunicorn -c gunicorn.conf.py run:app    # :8001
+#
+# ROUTE_GROUP=all (default) serves every route from one pool with the API profile.
+#
+# Reload: `kill -HUP <master pid>` starts fresh workers and lets the old ones
+# finish their in-flight requests. The old ones stop accepting right away, so
+# connections queue in the backlog while the new ones load the model; this is
+# not zero-downtime. The image pool reloads by itself when
+# models/karnataka_model.keras is replaced.
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+ROUTE_GROUP = os.getenv("ROUTE_GROUP", "all")
+CPUS = multiprocessing.cpu_count()
+
+wsgi_app = "run:app"
+preload_app = True       # import the app (and TensorFlow) once in the master
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+errorlog = "-"
+
+# The preloaded master must not talk to MongoDB (connections would be shared
+# across the fork), so create_app leaves index setup to post_fork
+os.environ["DB_SETUP_IN_WORKERS"] = "1"
+
+if ROUTE_GROUP == "image":
+    # CPU-bound: one request per process, one process per core, each running
+    # TensorFlow single-threaded (see post_fork); more workers than cores
+    # would only queue inference behind each other.
+    bind = os.getenv("BIND", "0.0.0.0:8001")
+    worker_class = "sync"
+    workers = int(os.getenv("WEB_CONCURRENCY", CPUS))
+    threads = 1
+    timeout = 60
+    backlog = 64
+    max_requests = 2000      # recycle workers to cap TensorFlow's slow memory growth
+    max_requests_jitter = 200
+else:
+    # IO-bound: requests mostly wait on MongoDB or the Groq API, so a few
+    # processes with many threads each keep the cores busy.
+    bind = os.getenv("BIND", "0.0.0.0:8000")
+    worker_class = "gthread"
+    workers = int(os.getenv("WEB_CONCURRENCY", CPUS * 2 + 1))
+    threads = int(os.getenv("GUNICORN_THREADS", 8))
+    timeout = 30
+    backlog = 2048
+    # No recycling: each worker holds the search index, and a fresh worker
+    # would have to rebuild it from both collections
+    max_requests = 0
+
+
+# TensorFlow sizes its thread pools to every core by default; with one worker
+# per core that is cores * cores compute threads fighting over the CPU
+TF_THREADS_PER_WORKER = int(os.getenv("TF_THREADS_PER_WORKER", 1))
+
+
+def post_fork(server, worker):
+    if ROUTE_GROUP in ("all", "image"):
+        import tensorflow as tf
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(TF_THREADS_PER_WORKER)
+            tf.config.threading.set_inter_op_parallelism_threads(TF_THREADS_PER_WORKER)
+        except RuntimeError as e:
+            # only possible before TensorFlow's runtime starts, i.e. if the master ran an op
+            server.log.warning("Worker %s could not limit TensorFlow threads: %s", worker.pid, e)
+        # Every worker holds its own copy of the model; nothing is shared.
+        # Load the model before the worker accepts traffic, so the first
+        # request after a (re)start does not pay for it
+        from models.image_recognition import load_model
+        load_model()
+        server.log.info("Worker %s loaded the image model", worker.pid)
+    if ROUTE_GROUP in ("all", "api"):
+        from extentions import init_indexes
+        from routes.search import sync_search_index
+        init_indexes(server.app.wsgi())
+        # Build the search index before the worker accepts traffic, so no
+        # search ever waits for it
+        try:
+            sync_search_index()
+            server.log.info("Worker %s built the search index", worker.pid)
+        except Exception as e:
+            server.log.warning("Worker %s could not build the search index: %s", worker.pid, e)
+
+
+def worker_exit(server, worker):
+    # Let queued background tasks (index refreshes, upload cleanup) finish
+    from tasks import runner
+    drained = runner.shutdown(timeout=graceful_timeout - 5)
+    if not drained:
+        server.log.warning("Worker %s exited with background tasks still pending", worker.pid)
+
+
+def _watch_model(server, interval=5):
+    from models.image_recognition import MODEL_PATH
+
+    def mtime():
+        try:
+            return os.path.getmtime(MODEL_PATH)
+        except OSError:
+            return None
+
+    last = mtime()
+    while True:
+        time.sleep(interval)
+        current = mtime()
+        if current is None or current == last:
+            continue
+        # Wait until the file stops changing so workers never load a half-written model
+        time.sleep(interval)
+        if mtime() != current:
+            continue
+        last = current
+        server.log.info("%s changed, gracefully reloading workers", MODEL_PATH)
+        os.kill(os.getpid(), signal.SIGHUP)
+
+
+def when_ready(server):
+    if ROUTE_GROUP in ("all", "image"):
+        threading.Thread(target=_watch_model, args=(server,), daemon=True).start()
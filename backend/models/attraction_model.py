@@ -1,4 +1,51 @@
 from datetime import datetime
+import re
+
+# map_url values look like "https://www.google.com/maps?q=15.3350,76.4600"
+_MAP_URL_COORDS = re.compile(r"[?&]q=(-?\d+(?:\.\d+)?),\s*(-?\d+(?:\.\d+)?)")
+
+
+def geo_point(lat, lng):
+    """
+    Build a GeoJSON Point (note: GeoJSON order is [lng, lat]).
+    Raises ValueError for non-numeric or out-of-range coordinates.
+    """
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        raise ValueError("Coordinates must be numbers")
+    # nan fails every comparison, so it is rejected here too
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("Coordinates out of range")
+    return {"type": "Point", "coordinates": [lng, lat]}
+
+
+def location_from_data(data):
+    """
+    Resolve a GeoJSON point from request data.
+    Accepts an explicit GeoJSON `location`, `latitude`/`longitude`
+    fields, or falls back to the coordinates embedded in `map_url`.
+    Returns None when no coordinates are available and raises ValueError
+    when the ones given are malformed.
+    """
+    location = data.get("location")
+    if location is not None:
+        if not isinstance(location, dict) or location.get("type") != "Point":
+            raise ValueError("location must be a GeoJSON Point")
+        coordinates = location.get("coordinates")
+        if not isinstance(coordinates, (list, tuple)) or len(coordinates) < 2:
+            raise ValueError("location.coordinates must be [lng, lat]")
+        return geo_point(coordinates[1], coordinates[0])
+
+    lat, lng = data.get("latitude"), data.get("longitude")
+    if lat is not None or lng is not None:
+        return geo_point(lat, lng)
+
+    match = _MAP_URL_COORDS.search(data.get("map_url") or "")
+    if match:
+        return geo_point(match.group(1), match.group(2))
+    return None
+
 
 def attraction_doc(data):
     return {
@@ -12,6 +59,7 @@ def attraction_doc(data):
         "tags": data.get("tags", []),
         "best_season": data.get("best_season"),
         "map_url": data.get("map_url"),
+        "location": location_from_data(data),
         "ar_model_url": data.get("ar_model_url"),
         "created_at": datetime.utcnow()
     }
@@ -0,0 +1,143 @@
+"""
+Temperature scaling for the landmark classifier.
+
+Fits a temperature T on the validation split so that softmax(logits / T)
+gives calibrated probabilities, and picks the "unknown place" threshold on the
+calibrated top-1 probability. Accurate mode averages a varying number of TTA
+views (whatever fits the latency budget), and fewer views give sharper
+averages, so both are fitted once per view count. Results go to
+models/calibration.json, which image_recognition.py reads with the model.
+
+    cd backend
+    python -m models.calibration --data ../dataset
+"""
+import json
+import os
+
+import numpy as np
+
+CALIBRATION_PATH = os.path.join(os.path.dirname(__file__), "calibration.json")
+DEFAULT_CALIBRATION = {"temperature": 1.0, "unknown_threshold": 0.35}
+
+
+def softmax(logits, temperature=1.0):
+    z = np.asarray(logits, dtype=np.float64) / temperature
+    z -= z.max(axis=-1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def nll(logits, labels, temperature):
+    probs = softmax(logits, temperature)
+    return float(-np.mean(np.log(probs[np.arange(len(labels)), labels] + 1e-12)))
+
+
+def fit_temperature(logits, labels, low=0.05, high=20.0, iters=60):
+    """Minimise validation NLL over T with a golden-section search on log T (NLL is unimodal in T)."""
+    ratio = (np.sqrt(5) - 1) / 2
+    a, b = np.log(low), np.log(high)
+    c, d = b - ratio * (b - a), a + ratio * (b - a)
+    fc, fd = nll(logits, labels, np.exp(c)), nll(logits, labels, np.exp(d))
+    for _ in range(iters):
+        if fc < fd:
+            b, d, fd = d, c, fc
+            c = b - ratio * (b - a)
+            fc = nll(logits, labels, np.exp(c))
+        else:
+            a, c, fc = c, d, fd
+            d = a + ratio * (b - a)
+            fd = nll(logits, labels, np.exp(d))
+    return float(np.exp((a + b) / 2))
+
+
+def pick_threshold(logits, labels, temperature, keep=0.95):
+    """
+    Highest top-1 probability threshold that still accepts `keep` of the
+    correctly classified validation images. Anything less confident than the
+    model is on most real landmarks is treated as an unknown place.
+    """
+    probs = softmax(logits, temperature)
+    correct = probs.argmax(axis=1) == labels
+    if not correct.any():
+        return DEFAULT_CALIBRATION["unknown_threshold"]
+    return float(np.quantile(probs.max(axis=1)[correct], 1 - keep))
+
+
+def calibration_for(calibration, n_views):
+    """The temperature/threshold fitted for `n_views` TTA views, else the top-level ones."""
+    return calibration.get("by_views", {}).get(str(n_views), calibration)
+
+
+def load_calibration(path=CALIBRATION_PATH):
+    try:
+        with open(path) as f:
+            return {**DEFAULT_CALIBRATION, **json.load(f)}
+    except (OSError, ValueError):
+        return dict(DEFAULT_CALIBRATION)
+
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".ppm", ".tif", ".tiff")
+
+
+def validation_files(data_dir, class_names, validation_split):
+    """
+    The held-out images exactly as ImageDataGenerator(validation_split=...)
+    .flow_from_directory() picked them for training: per class, filenames in
+    sorted order, the first `validation_split` fraction.
+    """
+    paths, labels = [], []
+    for label, name in enumerate(class_names):
+        folder = os.path.join(data_dir, name)
+        files = []
+        for root, _, names in sorted(os.walk(folder), key=lambda x: x[0]):
+            files.extend(os.path.join(root, f) for f in sorted(names) if f.lower().endswith(IMAGE_EXTENSIONS))
+        stop = int(validation_split * len(files))
+        paths.extend(files[:stop])
+        labels.extend([label] * stop)
+    return paths, np.array(labels)
+
+
+def fit(logits, labels, keep):
+    temperature = fit_temperature(logits, labels)
+    return {
+        "temperature": round(temperature, 4),
+        "unknown_threshold": round(pick_threshold(logits, labels, temperature, keep=keep), 4),
+        "nll_before": round(nll(logits, labels, 1.0), 4),
+        "nll_after": round(nll(logits, labels, temperature), 4),
+        "accuracy": round(float((logits.argmax(axis=1) == labels).mean()), 4),
+    }
+
+
+def main():
+    import argparse
+    from models.image_recognition import CLASS_NAMES, TTA_VIEWS, tta_log_probs
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=os.path.join(os.path.dirname(__file__), "..", "..", "dataset"))
+    parser.add_argument("--validation-split", type=float, default=0.2)
+    parser.add_argument("--views", type=int, default=None, help="Largest TTA view count to fit (default: all)")
+    parser.add_argument("--keep", type=float, default=0.95)
+    args = parser.parse_args()
+
+    # Same split as training, so the temperature is fit on images the model never saw.
+    # One pass over all views per image; every view count is a prefix of it.
+    paths, labels = validation_files(args.data, CLASS_NAMES, args.validation_split)
+    max_views = args.views or len(TTA_VIEWS)
+    log_probs = np.stack([tta_log_probs(p, views=max_views) for p in paths])
+
+    by_views = {
+        str(n): fit(log_probs[:, :n].mean(axis=1), labels, args.keep)
+        for n in range(1, max_views + 1)
+    }
+    result = {
+        **by_views[str(max_views)],
+        "validation_images": len(labels),
+        "by_views": by_views,
+    }
+    with open(CALIBRATION_PATH, "w") as f:
+        json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,36 @@ import tensorflow as tf
 from tensorflow.keras.preprocessing import image
 import numpy as np
 import os
+import threading
+import time
+
+from models.calibration import calibration_for, load_calibration, softmax
 
-# Load the trained model
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "karnataka_model.keras")
-model = tf.keras.models.load_model(MODEL_PATH)
+
+# The model is loaded per process on first use (or by gunicorn's post_fork hook),
+# never in the gunicorn master: TensorFlow's runtime is not fork-safe.
+_model = None
+_model_lock = threading.Lock()
+
+# Temperature and "unknown" threshold per TTA view count, fitted for the model on disk
+# (see models/calibration.py)
+CALIBRATION = None
+
+
+def load_model():
+    """(Re)load the model from disk and return it."""
+    global _model, CALIBRATION
+    with _model_lock:
+        _model = tf.keras.models.load_model(MODEL_PATH)
+        # Re-read with the model so a hot reload never pairs a new model with old calibration
+        CALIBRATION = load_calibration()
+        _warm_up(_model)
+        return _model
+
+
+def get_model():
+    return _model if _model is not None else load_model()
 
 # Define the class labels (same order as training)
 CLASS_NAMES = [
@@ -22,7 +48,7 @@ def predict_image(img_path):
     img_array = image.img_to_array(img)
     img_array = np.expand_dims(img_array, axis=0) / 255.0
 
-    predictions = model.predict(img_array)
+    predictions = get_model()(img_array, training=False).numpy()
     class_idx = np.argmax(predictions)
     confidence = round(np.max(predictions) * 100, 2)
 
@@ -30,3 +56,116 @@ def predict_image(img_path):
         "predicted_place": CLASS_NAMES[class_idx],
         "confidence": confidence
     }
+
+
+# ---------------- high-accuracy mode ----------------
+# Test-time augmentation: several crops/flips of one upload go through the model
+# as a single batch and their logits are averaged. Views are listed by value, so
+# when the latency budget only allows a few, the most useful ones are kept.
+TTA_VIEWS = [
+    ("full", False), ("full", True),
+    ("center", False), ("center", True),
+    ("top_left", False), ("top_right", False), ("bottom_left", False), ("bottom_right", False),
+    ("top_left", True), ("top_right", True), ("bottom_left", True), ("bottom_right", True),
+]
+CROP_FRACTION = 0.8
+# Model time allowed per accurate-mode request; the number of views is derived from it
+TTA_LATENCY_BUDGET_MS = float(os.getenv("TTA_LATENCY_BUDGET_MS", 400))
+
+# Running estimate of model time per view, used to size the batch to the budget.
+# Seeded by _warm_up() whenever a model is loaded.
+_view_cost_ms = None
+_cost_lock = threading.Lock()
+
+
+def _warm_up(model):
+    """
+    Run the model once so the first request does not pay for building and
+    allocating its graph, then time a warm full-size batch to seed the
+    per-view cost; the cold pass would make it look many times too slow.
+    """
+    global _view_cost_ms
+    batch = np.zeros((len(TTA_VIEWS), 224, 224, 3), dtype=np.float32)
+    model(batch[:1], training=False)
+    model(batch, training=False)
+    start = time.perf_counter()
+    model(batch, training=False)
+    with _cost_lock:
+        _view_cost_ms = (time.perf_counter() - start) * 1000 / len(TTA_VIEWS)
+
+
+def _crop(img, region):
+    if region == "full":
+        return img
+    w, h = img.size
+    cw, ch = int(w * CROP_FRACTION), int(h * CROP_FRACTION)
+    left = {"center": (w - cw) // 2, "top_left": 0, "bottom_left": 0}.get(region, w - cw)
+    top = {"center": (h - ch) // 2, "top_left": 0, "top_right": 0}.get(region, h - ch)
+    return img.crop((left, top, left + cw, top + ch))
+
+
+def _views_for_budget(budget_ms):
+    return int(max(1, min(len(TTA_VIEWS), budget_ms // _view_cost_ms)))
+
+
+def tta_log_probs(img_path, views=None, budget_ms=TTA_LATENCY_BUDGET_MS):
+    """
+    Log-probabilities for each of the first `views` TTA views of one image
+    (sized to the latency budget when not given), from one batched forward pass.
+    Returns an array of shape (views, classes).
+    """
+    global _view_cost_ms
+    model = get_model()
+    n_views = views or _views_for_budget(budget_ms)
+    img = image.load_img(img_path)
+
+    batch = []
+    for region, flip in TTA_VIEWS[:n_views]:
+        view = _crop(img, region).resize((224, 224))
+        arr = image.img_to_array(view) / 255.0
+        batch.append(arr[:, ::-1] if flip else arr)
+
+    start = time.perf_counter()
+    probs = model(np.stack(batch), training=False).numpy()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    with _cost_lock:
+        per_view = elapsed_ms / n_views
+        _view_cost_ms = per_view if _view_cost_ms is None else 0.8 * _view_cost_ms + 0.2 * per_view
+
+    # The model ends in a softmax, so log-probabilities are its logits up to a constant
+    return np.log(np.clip(probs, 1e-12, 1.0))
+
+
+def tta_logits(img_path, views=None, budget_ms=TTA_LATENCY_BUDGET_MS):
+    """Averaged log-probabilities over TTA views of one image. Returns (logits, number of views used)."""
+    log_probs = tta_log_probs(img_path, views=views, budget_ms=budget_ms)
+    return log_probs.mean(axis=0), len(log_probs)
+
+
+def predict_image_accurate(img_path, top_k=3, budget_ms=TTA_LATENCY_BUDGET_MS):
+    """
+    TTA prediction with calibrated top-k probabilities. Returns "unknown" as the
+    place when the best calibrated probability is below the rejection threshold.
+    """
+    start = time.perf_counter()
+    logits, n_views = tta_logits(img_path, budget_ms=budget_ms)
+    # Averages over fewer views are sharper, so each view count has its own fit
+    calibration = calibration_for(CALIBRATION, n_views)
+    probs = softmax(logits, calibration["temperature"])
+
+    order = np.argsort(probs)[::-1][:max(1, min(top_k, len(CLASS_NAMES)))]
+    best = float(probs[order[0]])
+    is_unknown = best < calibration["unknown_threshold"]
+
+    return {
+        "predicted_place": "unknown" if is_unknown else CLASS_NAMES[order[0]],
+        "confidence": round(best * 100, 2),
+        "is_unknown": bool(is_unknown),
+        "top_k": [
+            {"place": CLASS_NAMES[i], "probability": round(float(probs[i]), 4)}
+            for i in order
+        ],
+        "views": n_views,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
@@ -0,0 +1,142 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Defaults for splitting a route into days
+AVG_SPEED_KMH = 40.0        # typical road speed between Karnataka attractions
+VISIT_HOURS = 2.0           # time spent at each stop
+DAY_HOURS = 9.0             # travel + sightseeing budget per day
+
+
+def haversine_matrix(coords):
+    """
+    Pairwise great-circle distances (km) for an (n, 2) array of [lat, lng].
+    Fully vectorized: one broadcasted pass, no Python loops.
+    """
+    rad = np.radians(np.asarray(coords, dtype=np.float64))
+    lat, lng = rad[:, 0], rad[:, 1]
+    dlat = lat[:, None] - lat[None, :]
+    dlng = lng[:, None] - lng[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def nearest_neighbour(dist, start=0):
+    """Greedy open route starting at `start`, always hopping to the closest unvisited stop."""
+    n = len(dist)
+    visited = np.zeros(n, dtype=bool)
+    route = [start]
+    visited[start] = True
+    for _ in range(n - 1):
+        row = np.where(visited, np.inf, dist[route[-1]])
+        nxt = int(np.argmin(row))
+        route.append(nxt)
+        visited[nxt] = True
+    return route
+
+
+def two_opt(dist, route, fix_start=True, max_passes=50):
+    """
+    Improve an open route by reversing segments while it gets shorter.
+    For each i, the gain of every candidate j is computed in one numpy expression.
+    """
+    route = np.asarray(route)
+    n = len(route)
+    if n < 4:
+        return route.tolist()
+
+    first = 1 if fix_start else 0
+    for _ in range(max_passes):
+        improved = False
+        for i in range(first, n - 1):
+            # Reverse route[i..j] for every j > i:
+            #   before: prev -> route[i] ... route[j] -> next
+            #   after:  prev -> route[j] ... route[i] -> next
+            j = np.arange(i + 1, n)
+            b, c = route[i], route[j]
+            nxt = route[np.minimum(j + 1, n - 1)]
+            has_next = j + 1 < n
+
+            delta = np.where(has_next, dist[b, nxt] - dist[c, nxt], 0.0)
+            if i > 0:
+                a = route[i - 1]
+                delta = delta + dist[a, c] - dist[a, b]
+
+            best = int(np.argmin(delta))
+            if delta[best] < -1e-9:
+                k = j[best]
+                route[i:k + 1] = route[i:k + 1][::-1]
+                improved = True
+        if not improved:
+            break
+    return route.tolist()
+
+
+def route_length(dist, route):
+    route = np.asarray(route)
+    if len(route) < 2:
+        return 0.0
+    return float(dist[route[:-1], route[1:]].sum())
+
+
+def split_into_days(dist, route, origin=None, avg_speed_kmh=AVG_SPEED_KMH,
+                    visit_hours=VISIT_HOURS, day_hours=DAY_HOURS):
+    """
+    Cut an ordered route into days by travel + visit time.
+    `origin` is an optional starting node that is travelled from but not visited.
+    A day always gets at least one stop, even if that stop alone exceeds the budget.
+    """
+    days, current, used = [], [], 0.0
+    prev = origin
+    for idx in route:
+        travel = dist[prev, idx] / avg_speed_kmh if prev is not None else 0.0
+        cost = travel + visit_hours
+        if current and used + cost > day_hours:
+            # the travel to this stop is booked on the new day
+            days.append(current)
+            current, used = [], 0.0
+        current.append({"index": int(idx), "travel_hours": round(float(travel), 2)})
+        used += cost
+        prev = idx
+    if current:
+        days.append(current)
+    return days
+
+
+def optimize_route(coords, start=None, **day_options):
+    """
+    Order stops into a short visiting route and split it into days.
+
+    coords: list of [lat, lng] for each stop.
+    start:  optional [lat, lng] the traveller starts from (e.g. their hotel);
+            it is used as a fixed origin and is not part of the returned order.
+    Returns {"order": [...indices into coords...], "total_km": float, "days": [...]}
+    """
+    n = len(coords)
+    if n == 0:
+        return {"order": [], "total_km": 0.0, "days": []}
+
+    points = list(coords) if start is None else [start] + list(coords)
+    dist = haversine_matrix(points)
+
+    if start is None:
+        # Begin from the stop furthest from the centroid so the route sweeps across
+        centroid = np.mean(np.asarray(points, dtype=np.float64), axis=0)
+        origin = int(np.argmax(haversine_matrix(np.vstack([centroid, points]))[0, 1:]))
+        route = two_opt(dist, nearest_neighbour(dist, origin), fix_start=False)
+    else:
+        route = two_opt(dist, nearest_neighbour(dist, 0), fix_start=True)
+
+    total_km = route_length(dist, route)
+
+    if start is not None:
+        # drop the fixed origin and shift indices back onto `coords`
+        days = split_into_days(dist, route[1:], origin=0, **day_options)
+        route = [i - 1 for i in route[1:]]
+        for day in days:
+            for stop in day:
+                stop["index"] -= 1
+    else:
+        days = split_into_days(dist, route, **day_options)
+
+    return {"order": route, "total_km": round(total_km, 2), "days": days}
@@ -0,0 +1,234 @@
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Content-addressed store: MEDIA_ROOT/<sha256>/original.<ext>, <width>.<format>, manifest.json
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", os.path.join(BACKEND_DIR, "media"))
+MEDIA_URL_PREFIX = "/media"
+MEDIA_WORKERS = int(os.getenv("MEDIA_WORKERS", "2"))
+# Local image paths are only read from inside these folders
+LOCAL_SOURCE_DIRS = [
+    os.path.realpath(p)
+    for p in os.getenv("MEDIA_SOURCE_DIRS", os.path.join(BACKEND_DIR, "..", "dataset")).split(os.pathsep)
+]
+
+VARIANT_WIDTHS = (320, 640, 1280)
+THUMBNAIL_WIDTH = 320
+VARIANT_FORMATS = ("webp", "avif")
+QUALITY = {"webp": 80, "avif": 60}
+FETCH_TIMEOUT = 20
+MAX_SOURCE_BYTES = 25 * 1024 * 1024
+
+_pool = None
+_pool_lock = threading.Lock()   # guards _pool, _pending and _variant_cache
+_pending = {}       # source -> Future, so one source is never rendered twice at once
+_variant_cache = {} # source -> variants, filled from Mongo / finished jobs
+
+
+# ---------------- worker side (runs in the process pool) ----------------
+def _read_source(source):
+    if source.startswith(("http://", "https://")):
+        req = urllib.request.Request(source, headers={"User-Agent": "ExploreKarnataka-Media/1.0"})
+        with urllib.request.urlopen(req, timeout=FETCH_TIMEOUT) as resp:
+            return resp.read(MAX_SOURCE_BYTES + 1)
+    path = os.path.realpath(source)
+    if not any(path.startswith(root + os.sep) for root in LOCAL_SOURCE_DIRS):
+        raise ValueError(f"{source} is outside the allowed media source folders")
+    with open(path, "rb") as f:
+        return f.read(MAX_SOURCE_BYTES + 1)
+
+
+def _supported_formats():
+    from PIL import features
+    return [fmt for fmt in VARIANT_FORMATS if features.check(fmt)]
+
+
+def render_variants(source, media_root=MEDIA_ROOT, widths=VARIANT_WIDTHS):
+    """
+    Fetch one image and write its resized variants into the content-addressed store.
+    Safe to re-run: if the manifest for the content hash already exists it is reused.
+    Returns the manifest dict.
+    """
+    from PIL import Image, ImageOps
+
+    data = _read_source(source)
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ValueError(f"{source} is larger than {MAX_SOURCE_BYTES} bytes")
+
+    digest = hashlib.sha256(data).hexdigest()
+    folder = os.path.join(media_root, digest)
+    manifest_path = os.path.join(folder, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    os.makedirs(folder, exist_ok=True)
+    img = Image.open(io.BytesIO(data))
+    # exif_transpose returns a copy without `format` when it rotates, so read it first
+    ext = (img.format or "jpeg").lower().replace("jpeg", "jpg")
+    img = ImageOps.exif_transpose(img)
+    with open(os.path.join(folder, f"original.{ext}"), "wb") as f:
+        f.write(data)
+
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+
+    # never upscale, but always keep a thumbnail; a source between two sizes
+    # also gets a variant at its own width so the sharpest copy is not lost
+    targets = {w for w in widths if w <= img.width} | {min(widths)}
+    if min(widths) < img.width < max(widths):
+        targets.add(img.width)
+
+    variants = {}
+    for fmt in _supported_formats():
+        variants[fmt] = {}
+        for width in sorted(targets):
+            height = max(1, round(img.height * min(width, img.width) / img.width))
+            resized = img.resize((min(width, img.width), height), Image.LANCZOS)
+            name = f"{width}.{fmt}"
+            tmp = os.path.join(folder, f".{name}.tmp")
+            resized.save(tmp, format=fmt.upper(), quality=QUALITY[fmt])
+            os.replace(tmp, os.path.join(folder, name))
+            variants[fmt][str(width)] = name
+
+    manifest = {
+        "hash": digest,
+        "original": f"original.{ext}",
+        "width": img.width,
+        "height": img.height,
+        "variants": variants,
+    }
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, manifest_path)
+    return manifest
+
+
+# ---------------- app side ----------------
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Start workers from a clean forkserver (spawn where unavailable) rather
+            # than forking a gunicorn worker with live Mongo sockets and threads
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=MEDIA_WORKERS, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def shutdown_pool(wait=True):
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+            _pool = None
+
+
+def manifest_to_urls(manifest):
+    base = f"{MEDIA_URL_PREFIX}/{manifest['hash']}"
+    variants = {
+        fmt: {width: f"{base}/{name}" for width, name in names.items()}
+        for fmt, names in manifest["variants"].items()
+    }
+    thumb_fmt = next(iter(variants), None)
+    return {
+        "original": f"{base}/{manifest['original']}",
+        "thumbnail": variants[thumb_fmt].get(str(THUMBNAIL_WIDTH)) if thumb_fmt else None,
+        "width": manifest["width"],
+        "height": manifest["height"],
+        "srcset": {
+            fmt: ", ".join(f"{url} {w}w" for w, url in sorted(urls.items(), key=lambda kv: int(kv[0])))
+            for fmt, urls in variants.items()
+        },
+        "variants": variants,
+    }
+
+
+def enqueue(sources, collection):
+    """
+    Queue sources for rendering in the process pool; returns immediately.
+    `collection` is the Mongo collection that records finished manifests.
+    """
+    queued = 0
+    pool = _get_pool()
+    for source in sources:
+        with _pool_lock:
+            if not source or source in _variant_cache or source in _pending:
+                continue
+            future = pool.submit(render_variants, source)
+            _pending[source] = future
+        # outside the lock: the callback runs right here if the job already finished
+        future.add_done_callback(lambda fut, src=source: _on_done(src, fut, collection))
+        queued += 1
+    return queued
+
+
+def _on_done(source, future, collection):
+    with _pool_lock:
+        _pending.pop(source, None)
+    try:
+        manifest = future.result()
+    except Exception as e:
+        print(f"❌ Media processing failed for {source}:", e)
+        collection.update_one(
+            {"source": source},
+            {"$set": {"source": source, "status": "failed", "error": str(e)}},
+            upsert=True
+        )
+        return
+    urls = manifest_to_urls(manifest)
+    with _pool_lock:
+        _variant_cache[source] = urls
+    collection.update_one(
+        {"source": source},
+        {"$set": {"source": source, "status": "ready", "hash": manifest["hash"], "urls": urls}},
+        upsert=True
+    )
+
+
+def lookup_variants(sources, collection):
+    """Map each source URL to its variant URLs (only sources that are ready)."""
+    with _pool_lock:
+        missing = [s for s in set(sources) if s and s not in _variant_cache]
+    if missing:
+        found = {
+            m["source"]: m["urls"]
+            for m in collection.find({"source": {"$in": missing}, "status": "ready"}, {"source": 1, "urls": 1})
+        }
+        with _pool_lock:
+            _variant_cache.update(found)
+    with _pool_lock:
+        return {s: _variant_cache[s] for s in sources if s in _variant_cache}
+
+
+def image_sources(doc):
+    """All image references on an attraction (`images`) or festival (`image`) document."""
+    sources = list(doc.get("images") or [])
+    if doc.get("image"):
+        sources.append(doc["image"])
+    return sources
+
+
+def attach_variants(docs, collection):
+    """
+    Add `image_variants` (parallel to `images`) and `thumbnail` to attraction docs,
+    and `image_variants` to festival docs. Originals are left in place so clients
+    fall back to them while rendering is still pending.
+    """
+    found = lookup_variants([s for d in docs for s in image_sources(d)], collection)
+    for d in docs:
+        if "images" in d:
+            d["image_variants"] = [found.get(s) for s in d.get("images") or []]
+            first = next((v for v in d["image_variants"] if v), None)
+            d["thumbnail"] = first["thumbnail"] if first else None
+        if d.get("image"):
+            d["image_variants"] = found.get(d["image"])
+    return docs
@@ -0,0 +1,231 @@
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+# Field weights: a hit in the name counts for more than one in the description
+ATTRACTION_FIELDS = {"name": 3.0, "tags": 2.0, "category": 1.5, "description": 1.0}
+FESTIVAL_FIELDS = {"name": 3.0, "location": 2.0}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Typo tolerance: trigram similarity needed before a vocabulary term is
+# treated as a spelling of the query term, and the score penalty it carries
+FUZZY_MIN_SIMILARITY = 0.45
+FUZZY_MAX_EXPANSIONS = 3
+
+# \w alone splits Kannada words at every vowel sign and virama (combining
+# marks are not alphanumeric), so the whole Kannada block counts as word text
+_TOKEN = re.compile(r"[\w\u0C80-\u0CFF]+", re.UNICODE)
+
+
+def _is_latin_accent(c):
+    return "\u0300" <= c <= "\u036F"
+
+
+def tokenize(text):
+    """Lowercase, strip Latin accents and split into word tokens."""
+    if not text:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = " ".join(str(t) for t in text if t)
+    text = unicodedata.normalize("NFKD", str(text).lower())
+    # Only Latin diacritics go: in Kannada the combining marks spell the word
+    text = unicodedata.normalize("NFC", "".join(c for c in text if not _is_latin_accent(c)))
+    return _TOKEN.findall(text)
+
+
+def trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    In-memory inverted index over attractions and festivals.
+
+    Documents are keyed by (kind, id) so both collections share one vocabulary.
+    Scores are BM25 over field-weighted term frequencies. Query terms missing
+    from the vocabulary are expanded to similar terms via a trigram index,
+    and the last query term is also matched as a prefix (autocomplete).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = defaultdict(dict)    # term -> {doc_key: weighted tf}
+        self._doc_terms = {}                  # doc_key -> {term: weighted tf}
+        self._doc_len = {}                    # doc_key -> weighted length
+        self._docs = {}                       # doc_key -> stored summary
+        self._total_len = 0.0
+        self._trigrams = defaultdict(set)     # trigram -> {term}
+        self._sorted_terms = None             # lazily rebuilt for prefix lookups
+        self.loaded = False
+        self.version = 0                      # last catalog change reflected here
+
+    # ---------------- indexing ----------------
+    def upsert(self, kind, doc_id, doc):
+        fields = ATTRACTION_FIELDS if kind == "attraction" else FESTIVAL_FIELDS
+        key = (kind, str(doc_id))
+
+        weighted = Counter()
+        for field, weight in fields.items():
+            for token in tokenize(doc.get(field)):
+                weighted[token] += weight
+
+        summary = {"id": str(doc_id), "type": kind, "name": doc.get("name")}
+        if kind == "attraction":
+            summary["category"] = doc.get("category")
+            summary["images"] = (doc.get("images") or [])[:1]
+        else:
+            summary["location"] = doc.get("location")
+            summary["date"] = doc.get("date")
+
+        with self._lock:
+            self._remove_locked(key)
+            for term, tf in weighted.items():
+                if term not in self._postings:
+                    self._add_term_locked(term)
+                self._postings[term][key] = tf
+            self._doc_terms[key] = dict(weighted)
+            self._doc_len[key] = sum(weighted.values())
+            self._total_len += self._doc_len[key]
+            self._docs[key] = summary
+
+    def remove(self, kind, doc_id):
+        with self._lock:
+            self._remove_locked((kind, str(doc_id)))
+
+    def _remove_locked(self, key):
+        terms = self._doc_terms.pop(key, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(key, None)
+            if not posting:
+                del self._postings[term]
+                self._drop_term_locked(term)
+        self._total_len -= self._doc_len.pop(key, 0.0)
+        self._docs.pop(key, None)
+
+    def _add_term_locked(self, term):
+        for gram in trigrams(term):
+            self._trigrams[gram].add(term)
+        self._sorted_terms = None
+
+    def _drop_term_locked(self, term):
+        for gram in trigrams(term):
+            bucket = self._trigrams.get(gram)
+            if bucket is not None:
+                bucket.discard(term)
+                if not bucket:
+                    del self._trigrams[gram]
+        self._sorted_terms = None
+
+    def rebuild(self, attractions, festivals, version=0):
+        """Replace the whole index from iterables of Mongo documents as of catalog `version`."""
+        fresh = SearchIndex()
+        for a in attractions:
+            fresh.upsert("attraction", a["_id"], a)
+        for f in festivals:
+            fresh.upsert("festival", f["_id"], f)
+        with self._lock:
+            self.__dict__.update({k: v for k, v in fresh.__dict__.items() if k != "_lock"})
+            self.loaded = True
+            self.version = version
+
+    def __len__(self):
+        return len(self._docs)
+
+    # ---------------- lookup ----------------
+    def _terms_with_prefix(self, prefix, limit=10):
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = self._sorted_terms
+        out = []
+        i = bisect_left(terms, prefix)
+        while i < len(terms) and terms[i].startswith(prefix) and len(out) < limit:
+            out.append(terms[i])
+            i += 1
+        return out
+
+    def _similar_terms(self, term):
+        """Vocabulary terms sharing enough trigrams with `term`, best first."""
+        grams = trigrams(term)
+        overlap = Counter()
+        for gram in grams:
+            for candidate in self._trigrams.get(gram, ()):
+                overlap[candidate] += 1
+        scored = []
+        for candidate, shared in overlap.items():
+            # Dice coefficient over trigram sets
+            similarity = 2 * shared / (len(grams) + len(trigrams(candidate)))
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                scored.append((similarity, candidate))
+        scored.sort(reverse=True)
+        return [(c, s) for s, c in scored[:FUZZY_MAX_EXPANSIONS]]
+
+    def _expand(self, term, is_last):
+        """Map a query term to [(index term, weight)]."""
+        expansions = {}
+        if term in self._postings:
+            expansions[term] = 1.0
+        if is_last:
+            for t in self._terms_with_prefix(term):
+                expansions.setdefault(t, 0.8)
+        if not expansions:
+            for t, similarity in self._similar_terms(term):
+                expansions[t] = similarity * 0.9
+        return expansions
+
+    def search(self, query, kind=None, limit=10):
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            n_docs = len(self._docs)
+            if n_docs == 0:
+                return []
+            # BM25 length norm K1 * (1 - B + B * len / avg_len), split so only the
+            # per-document length is looked up and writes never invalidate anything
+            norm_base = K1 * (1 - B)
+            norm_per_len = K1 * B / (self._total_len / n_docs or 1.0)
+            doc_len = self._doc_len
+
+            scores = defaultdict(float)
+            for pos, term in enumerate(terms):
+                for index_term, weight in self._expand(term, pos == len(terms) - 1).items():
+                    posting = self._postings[index_term]
+                    df = len(posting)
+                    idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                    factor = weight * idf * (K1 + 1)
+                    for key, tf in posting.items():
+                        scores[key] += factor * tf / (tf + norm_base + norm_per_len * doc_len[key])
+
+            if kind:
+                scores = {key: score for key, score in scores.items() if key[0] == kind}
+            ranked = heapq.nlargest(limit, scores.items(), key=lambda kv: kv[1])
+            return [dict(self._docs[key], score=round(score, 4)) for key, score in ranked]
+
+    def autocomplete(self, prefix, limit=8):
+        """Document names for the best matches of a partially typed query."""
+        seen, out = set(), []
+        for hit in self.search(prefix, limit=limit * 2):
+            name = hit.get("name")
+            if name and name not in seen:
+                seen.add(name)
+                out.append({"id": hit["id"], "type": hit["type"], "name": name})
+            if len(out) >= limit:
+                break
+        return out
+
+
+search_index = SearchIndex()
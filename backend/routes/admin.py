@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from bson import ObjectId
 from app import mongo
+from extentions import DB_UNAVAILABLE
 
 admin_bp = Blueprint("admin", __name__)
 
@@ -30,5 +31,7 @@ def check_admin():
 
         return jsonify({"message": "Welcome Admin!", "user": {"name": user["name"], "email": user["email"]}}), 200
 
+    except DB_UNAVAILABLE:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
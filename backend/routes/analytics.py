@@ -3,6 +3,8 @@ from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from bson import ObjectId
 import random
+from extentions import db_deadline, pool_metrics
+from tasks import runner
 
 # Blueprint setup
 analytics_bp = Blueprint("analytics", __name__)
@@ -11,6 +13,7 @@ analytics_bp = Blueprint("analytics", __name__)
 # ADMIN ANALYTICS ROUTE  ✅ PHASE 1
 # -----------------------------------------
 @analytics_bp.route("/admin/analytics", methods=["GET"])
+@db_deadline("admin")
 @jwt_required()
 def admin_analytics():
     from app import mongo  # import mongo within function to avoid circular import
@@ -57,3 +60,48 @@ def admin_analytics():
         "category_distribution": category_counts,
         "visitor_trends": visitor_data,
     }), 200
+
+
+# -----------------------------------------
+# ADMIN DB POOL METRICS
+# -----------------------------------------
+@analytics_bp.route("/admin/db-metrics", methods=["GET"])
+@db_deadline("admin")
+@jwt_required()
+def db_metrics():
+    """Connection pool checkouts, wait times and failures for this worker process."""
+    from app import mongo
+
+    uid = get_jwt_identity()
+    user = mongo.db.users.find_one({"_id": ObjectId(uid)})
+
+    if not user or user.get("role") != "admin":
+        return jsonify({"error": "Access denied"}), 403
+
+    options = mongo.cx.options.pool_options
+    return jsonify({
+        "pool": {
+            "max_pool_size": options.max_pool_size,
+            "min_pool_size": options.min_pool_size,
+        },
+        "metrics": pool_metrics.snapshot(),
+    }), 200
+
+
+# -----------------------------------------
+# ADMIN BACKGROUND TASK METRICS
+# -----------------------------------------
+@analytics_bp.route("/admin/task-metrics", methods=["GET"])
+@db_deadline("admin")
+@jwt_required()
+def task_metrics():
+    """Background task queue depth, throughput and failures for this worker process."""
+    from app import mongo
+
+    uid = get_jwt_identity()
+    user = mongo.db.users.find_one({"_id": ObjectId(uid)})
+
+    if not user or user.get("role") != "admin":
+        return jsonify({"error": "Access denied"}), 403
+
+    return jsonify(runner.metrics()), 200
@@ -1,9 +1,14 @@
+import math
 from flask import Blueprint, jsonify, request
-from extentions import mongo
+from extentions import mongo, catalog, db_deadline, DB_UNAVAILABLE
 from bson import ObjectId
 from bson.errors import InvalidId
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.attraction_model import attraction_doc
+from models.search_index import search_index
+from routes.search import record_catalog_change
+from tasks import runner
+from models.media import attach_variants, enqueue, image_sources
+from models.attraction_model import attraction_doc, geo_point, location_from_data
 
 
 attractions_bp = Blueprint("attractions", __name__)
@@ -22,60 +27,142 @@ def admin_only(func):
     return wrapper
 
 
+# -------------------- BACKGROUND TASKS --------------------
+@runner.task("refresh_attraction")
+def refresh_attraction(id):
+    """Bring derived data (search index, image variants) in line with the stored attraction."""
+    query = {"_id": ObjectId(id)} if ObjectId.is_valid(id) else {"_id": id}
+    doc = mongo.db.attractions.find_one(query)
+    # other workers' search indexes pick this up from the change log
+    record_catalog_change("attraction", query["_id"])
+    if not doc:
+        search_index.remove("attraction", id)
+        mongo.db.recommendations.delete_many({})
+        return
+    search_index.upsert("attraction", doc["_id"], doc)
+    enqueue(image_sources(doc), mongo.db.media)
+    # cached per-user recommendations may now be stale
+    mongo.db.recommendations.delete_many({})
+
+
 # -------------------- PUBLIC ROUTES --------------------
 @attractions_bp.route("/", methods=["GET"])
+@db_deadline("catalog")
 def get_all_attractions():
-    attractions = list(mongo.db.attractions.find())
+    attractions = list(catalog("attractions").find())
+    for a in attractions:
+        a["_id"] = str(a["_id"])
+    attach_variants(attractions, mongo.db.media)
+    return jsonify(attractions), 200
+
+
+@attractions_bp.route("/near", methods=["GET"])
+@db_deadline("catalog")
+def get_nearby_attractions():
+    """
+    Attractions closest to a point, nearest first.
+    Query params: lat, lng, max_distance (metres, default 50 km), limit (default 10).
+    """
+    try:
+        lat = float(request.args["lat"])
+        lng = float(request.args["lng"])
+        max_distance = float(request.args.get("max_distance", 50000))
+        limit = int(request.args.get("limit", 10))
+    except (KeyError, ValueError):
+        return jsonify({"error": "lat and lng are required numbers"}), 400
+
+    try:
+        near = geo_point(lat, lng)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not 0 <= max_distance < math.inf:
+        return jsonify({"error": "max_distance must be a non-negative number of metres"}), 400
+    limit = max(1, min(limit, 100))
+
+    # $geoNear (rather than $near) so the distance comes back with each result
+    pipeline = [
+        {
+            "$geoNear": {
+                "near": near,
+                "distanceField": "distance_m",
+                "maxDistance": max_distance,
+                "spherical": True,
+            }
+        },
+        {"$limit": limit},
+    ]
+    attractions = list(catalog("attractions").aggregate(pipeline))
     for a in attractions:
         a["_id"] = str(a["_id"])
+        a["distance_m"] = round(a["distance_m"], 1)
+    attach_variants(attractions, mongo.db.media)
     return jsonify(attractions), 200
 
 
 @attractions_bp.route("/<id>", methods=["GET"])
+@db_deadline("catalog")
 def get_attraction(id):
     try:
         query = {"_id": ObjectId(id)} if ObjectId.is_valid(id) else {"_id": id}
-        a = mongo.db.attractions.find_one(query)
+        a = catalog("attractions").find_one(query)
         if not a:
             return jsonify({"error": "Not found"}), 404
         a["_id"] = str(a["_id"])
+        attach_variants([a], mongo.db.media)
         return jsonify(a), 200
+    except DB_UNAVAILABLE:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 # -------------------- ADMIN ROUTES --------------------
 @attractions_bp.route("", methods=["POST"])
+@db_deadline("admin")
 @admin_only
 def add_attraction():
     data = request.get_json()
     if not data or "name" not in data:
         return jsonify({"error": "Invalid data"}), 400
 
-    doc = attraction_doc(data)
+    try:
+        doc = attraction_doc(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     result = mongo.db.attractions.insert_one(doc)
     doc["_id"] = str(result.inserted_id)
+    runner.submit("refresh_attraction", doc["_id"])
     return jsonify(doc), 201
 
 
 @attractions_bp.route("/<id>", methods=["PUT"])
+@db_deadline("admin")
 @admin_only
 def update_attraction(id):
     data = request.get_json()
     if not data:
         return jsonify({"error": "No update data"}), 400
+    try:
+        location = location_from_data(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if location:
+        data["location"] = location
     query = {"_id": ObjectId(id)} if ObjectId.is_valid(id) else {"_id": id}
     result = mongo.db.attractions.update_one(query, {"$set": data})
     if result.matched_count == 0:
         return jsonify({"error": "Not found"}), 404
+    runner.submit("refresh_attraction", id)
     return jsonify({"message": "Attraction updated"}), 200
 
 
 @attractions_bp.route("/<id>", methods=["DELETE"])
+@db_deadline("admin")
 @admin_only
 def delete_attraction(id):
     query = {"_id": ObjectId(id)} if ObjectId.is_valid(id) else {"_id": id}
     result = mongo.db.attractions.delete_one(query)
     if result.deleted_count == 0:
         return jsonify({"error": "Not found"}), 404
+    runner.submit("refresh_attraction", id)
     return jsonify({"message": "Attraction deleted"}), 200
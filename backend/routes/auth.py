@@ -2,7 +2,8 @@
 from flask import Blueprint, request, jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from extentions import mongo
+from extentions import mongo, db_deadline, DB_UNAVAILABLE
+from tasks import runner
 from bson import ObjectId
 import datetime
 import os
@@ -18,6 +19,8 @@ def _find_user_by_id(uid: str):
     try:
         if ObjectId.is_valid(uid):
             return mongo.db.users.find_one({"_id": ObjectId(uid)})
+    except DB_UNAVAILABLE:
+        raise
     except Exception:
         # If conversion failed for any reason, fall through to string lookup
         pass
@@ -25,6 +28,7 @@ def _find_user_by_id(uid: str):
 
 
 @auth_bp.route("/register", methods=["POST"])
+@db_deadline("user")
 def register():
     """
     Register a new user.
@@ -67,6 +71,7 @@ def register():
 
 
 @auth_bp.route("/login", methods=["POST"])
+@db_deadline("user")
 def login():
     """
     Login endpoint.
@@ -105,6 +110,7 @@ def login():
 
 
 @auth_bp.route("/me", methods=["GET"])
+@db_deadline("user")
 @jwt_required()
 def me():
     uid = get_jwt_identity()
@@ -127,6 +133,7 @@ def me():
 
 
 @auth_bp.route("/profile", methods=["PUT"])
+@db_deadline("user")
 @jwt_required()
 def update_profile():
     uid = get_jwt_identity()
@@ -153,6 +160,7 @@ def update_profile():
             }
         }
     )
+    runner.submit("refresh_recommendations", str(user["_id"]))
 
     return jsonify({
         "message": "Profile updated successfully",
@@ -4,7 +4,7 @@ from bson import ObjectId
 import os
 
 from groq import Groq
-from extentions import mongo
+from extentions import mongo, db_deadline
 
 chat_bp = Blueprint("chat", __name__)
 
@@ -14,6 +14,7 @@ client = Groq(
 )
 
 @chat_bp.route("/chat", methods=["POST"])
+@db_deadline("user")
 @jwt_required()
 def chat():
     user_id = get_jwt_identity()
@@ -1,9 +1,13 @@
 from flask import Blueprint, jsonify, request
-from extentions import mongo
+from extentions import mongo, catalog, db_deadline
 from bson import ObjectId
 from bson.errors import InvalidId
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.festival_model import festival_doc
+from models.search_index import search_index
+from routes.search import record_catalog_change
+from tasks import runner
+from models.media import attach_variants, enqueue, image_sources
 
 
 festivals_bp = Blueprint("festivals", __name__)
@@ -22,27 +26,47 @@ def admin_only(func):
     return wrapper
 
 
+# -------------------- BACKGROUND TASKS --------------------
+@runner.task("refresh_festival")
+def refresh_festival(id):
+    """Bring derived data (search index, image variants) in line with the stored festival."""
+    query = {"_id": ObjectId(id)} if ObjectId.is_valid(id) else {"_id": id}
+    doc = mongo.db.festivals.find_one(query)
+    # other workers' search indexes pick this up from the change log
+    record_catalog_change("festival", query["_id"])
+    if not doc:
+        search_index.remove("festival", id)
+        return
+    search_index.upsert("festival", doc["_id"], doc)
+    enqueue(image_sources(doc), mongo.db.media)
+
+
 # -------------------- PUBLIC --------------------
 @festivals_bp.route("/", methods=["GET"])
+@db_deadline("catalog")
 def get_all_festivals():
-    festivals = list(mongo.db.festivals.find())
+    festivals = list(catalog("festivals").find())
     for f in festivals:
         f["_id"] = str(f["_id"])
+    attach_variants(festivals, mongo.db.media)
     return jsonify(festivals), 200
 
 
 @festivals_bp.route("/<id>", methods=["GET"])
+@db_deadline("catalog")
 def get_festival(id):
     query = {"_id": ObjectId(id)} if ObjectId.is_valid(id) else {"_id": id}
-    f = mongo.db.festivals.find_one(query)
+    f = catalog("festivals").find_one(query)
     if not f:
         return jsonify({"error": "Not found"}), 404
     f["_id"] = str(f["_id"])
+    attach_variants([f], mongo.db.media)
     return jsonify(f), 200
 
 
 # -------------------- ADMIN --------------------
 @festivals_bp.route("", methods=["POST"])
+@db_deadline("admin")
 @admin_only
 def add_festival():
     data = request.get_json()
@@ -51,10 +75,12 @@ def add_festival():
     doc = festival_doc(data)
     result = mongo.db.festivals.insert_one(doc)
     doc["_id"] = str(result.inserted_id)
+    runner.submit("refresh_festival", doc["_id"])
     return jsonify(doc), 201
 
 
 @festivals_bp.route("/<id>", methods=["PUT"])
+@db_deadline("admin")
 @admin_only
 def update_festival(id):
     data = request.get_json()
@@ -64,14 +90,17 @@ def update_festival(id):
     result = mongo.db.festivals.update_one(query, {"$set": data})
     if result.matched_count == 0:
         return jsonify({"error": "Not found"}), 404
+    runner.submit("refresh_festival", id)
     return jsonify({"message": "Festival updated"}), 200
 
 
 @festivals_bp.route("/<id>", methods=["DELETE"])
+@db_deadline("admin")
 @admin_only
 def delete_festival(id):
     query = {"_id": ObjectId(id)} if ObjectId.is_valid(id) else {"_id": id}
     result = mongo.db.festivals.delete_one(query)
     if result.deleted_count == 0:
         return jsonify({"error": "Not found"}), 404
+    runner.submit("refresh_festival", id)
     return jsonify({"message": "Festival deleted"}), 200
@@ -1,20 +1,49 @@
 from flask import Blueprint, request, jsonify
-from models.image_recognition import predict_image
+from models.image_recognition import predict_image, predict_image_accurate
+from tasks import runner
 import os
+import uuid
 
 image_bp = Blueprint("image_recognition", __name__)
 
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+
+@runner.task("remove_upload", retries=1, local=True)
+def remove_upload(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
 @image_bp.route("/predict", methods=["POST"])
 def predict():
     if "file" not in request.files:
         return jsonify({"error": "No image uploaded"}), 400
 
+    # mode=accurate: batched test-time augmentation with calibrated top-k
+    mode = request.args.get("mode") or request.form.get("mode") or "fast"
+    if mode not in ("fast", "accurate"):
+        return jsonify({"error": "mode must be 'fast' or 'accurate'"}), 400
+    try:
+        top_k = int(request.args.get("top_k") or request.form.get("top_k") or 3)
+    except ValueError:
+        return jsonify({"error": "top_k must be a number"}), 400
+
+    # Unique name per request: concurrent uploads of "photo.jpg" must not clobber
+    # each other, and the cleanup task must only delete this request's file
     file = request.files["file"]
-    file_path = os.path.join(UPLOAD_FOLDER, file.filename)
+    ext = os.path.splitext(file.filename or "")[1].lower()[:10]
+    file_path = os.path.join(UPLOAD_FOLDER, f"{uuid.uuid4().hex}{ext}")
     file.save(file_path)
 
-    result = predict_image(file_path)
+    try:
+        if mode == "accurate":
+            result = predict_image_accurate(file_path, top_k=top_k)
+        else:
+            result = predict_image(file_path)
+    finally:
+        runner.submit("remove_upload", file_path)
     return jsonify(result)
@@ -2,14 +2,19 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from bson import ObjectId
-from extentions import mongo
+from extentions import mongo, db_deadline, DB_UNAVAILABLE
+from models.itinerary_optimizer import optimize_route
+from models.attraction_model import geo_point
+from models.media import attach_variants
 import datetime
+import math
 
 itinerary_bp = Blueprint("itinerary", __name__)
 
 # Get all itineraries for the logged-in user
 # Get all itineraries for the logged-in user
 @itinerary_bp.route("", methods=["GET"])
+@db_deadline("user")
 @jwt_required()
 def get_itineraries():
     uid = get_jwt_identity()
@@ -30,14 +35,106 @@ def get_itineraries():
                     "best_season": attraction.get("best_season", "All Year")
                 })
 
+        attach_variants(results, mongo.db.media)
         return jsonify(results), 200
+    except DB_UNAVAILABLE:
+        raise
     except Exception as e:
         print("❌ Error loading itineraries:", e)
         return jsonify({"error": str(e)}), 500
 
 
+# Order the logged-in user's saved attractions into a day-by-day route
+@itinerary_bp.route("/route", methods=["GET"])
+@db_deadline("user")
+@jwt_required()
+def get_itinerary_route():
+    """
+    Optional query params:
+      lat, lng        - starting point (e.g. hotel); defaults to the best end of the route
+      speed_kmh       - average travel speed between stops
+      visit_hours     - time spent at each stop
+      day_hours       - travel + sightseeing budget per day
+    """
+    uid = get_jwt_identity()
+
+    start = None
+    if "lat" in request.args or "lng" in request.args:
+        if "lat" not in request.args or "lng" not in request.args:
+            return jsonify({"error": "lat and lng must be given together"}), 400
+        try:
+            point = geo_point(request.args["lat"], request.args["lng"])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        start = point["coordinates"][::-1]  # [lat, lng]
+
+    try:
+        day_options = {}
+        for param, key in (("speed_kmh", "avg_speed_kmh"), ("visit_hours", "visit_hours"), ("day_hours", "day_hours")):
+            if param in request.args:
+                day_options[key] = float(request.args[param])
+    except ValueError:
+        return jsonify({"error": "Query parameters must be numbers"}), 400
+
+    # comparisons with nan are False, so these also reject nan
+    if not (0 < day_options.get("avg_speed_kmh", 1) < math.inf and 0 < day_options.get("day_hours", 1) < math.inf):
+        return jsonify({"error": "speed_kmh and day_hours must be positive"}), 400
+    if not 0 <= day_options.get("visit_hours", 0) < math.inf:
+        return jsonify({"error": "visit_hours must not be negative"}), 400
+
+    try:
+        itineraries = list(mongo.db.itineraries.find({"user_id": ObjectId(uid)}))
+        ids = [ObjectId(i["attraction_id"]) for i in itineraries if ObjectId.is_valid(i["attraction_id"])]
+        attractions = {
+            str(a["_id"]): a
+            for a in mongo.db.attractions.find(
+                {"_id": {"$in": ids}},
+                {"name": 1, "category": 1, "images": 1, "best_season": 1, "location": 1}
+            )
+        }
+
+        stops, unplaced = [], []
+        for i in itineraries:
+            attraction = attractions.get(str(i["attraction_id"]))
+            if not attraction:
+                continue
+            item = {
+                "id": str(i["_id"]),
+                "attraction_id": str(attraction["_id"]),
+                "name": attraction.get("name", "Unknown"),
+                "category": attraction.get("category", "Unknown"),
+                "images": attraction.get("images", []),
+                "best_season": attraction.get("best_season", "All Year")
+            }
+            if attraction.get("location"):
+                item["coords"] = attraction["location"]["coordinates"][::-1]  # [lat, lng]
+                stops.append(item)
+            else:
+                unplaced.append(item)
+
+        plan = optimize_route([s.pop("coords") for s in stops], start=start, **day_options)
+        attach_variants(stops + unplaced, mongo.db.media)
+
+        days = [
+            [dict(stops[stop["index"]], travel_hours=stop["travel_hours"]) for stop in day]
+            for day in plan["days"]
+        ]
+
+        return jsonify({
+            "total_km": plan["total_km"],
+            "days": days,
+            "unplaced": unplaced
+        }), 200
+    except DB_UNAVAILABLE:
+        raise
+    except Exception as e:
+        print("❌ Error building itinerary route:", e)
+        return jsonify({"error": str(e)}), 500
+
+
 # Add an attraction to the logged-in user’s itinerary
 @itinerary_bp.route("", methods=["POST"])
+@db_deadline("user")
 @jwt_required()
 def add_itinerary():
     uid = get_jwt_identity()
@@ -67,6 +164,7 @@ def add_itinerary():
 
 # Delete itinerary item
 @itinerary_bp.route("/<id>", methods=["DELETE"])
+@db_deadline("user")
 @jwt_required()
 def delete_itinerary(id):
     uid = get_jwt_identity()
@@ -0,0 +1,69 @@
+import re
+
+from flask import Blueprint, jsonify, send_from_directory, abort
+from extentions import mongo, db_deadline
+from bson import ObjectId
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models.media import MEDIA_ROOT, enqueue, image_sources
+
+media_bp = Blueprint("media", __name__)
+
+# Files under a content hash never change, so caches may keep them forever
+IMMUTABLE_MAX_AGE = 31536000
+_HASH = re.compile(r"^[0-9a-f]{64}$")
+_FILENAME = re.compile(r"^(original\.[a-z0-9]+|\d+\.(webp|avif))$")
+
+
+# 🧩 Reuse admin check
+def admin_only(func):
+    from functools import wraps
+    @wraps(func)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        uid = get_jwt_identity()
+        user = mongo.db.users.find_one({"_id": ObjectId(uid)})
+        if not user or user.get("role") != "admin":
+            return jsonify({"error": "Access denied"}), 403
+        return func(*args, **kwargs)
+    return wrapper
+
+
+# -------------------- PUBLIC --------------------
+@media_bp.route("/media/<digest>/<filename>", methods=["GET"])
+def serve_media(digest, filename):
+    """Serve a stored original or variant. send_from_directory handles Range and ETag/304."""
+    if not _HASH.match(digest) or not _FILENAME.match(filename):
+        abort(404)
+    response = send_from_directory(
+        MEDIA_ROOT, f"{digest}/{filename}", conditional=True, max_age=IMMUTABLE_MAX_AGE
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+# -------------------- ADMIN --------------------
+@media_bp.route("/api/media/ingest", methods=["POST"])
+@db_deadline("admin")
+@admin_only
+def ingest_all():
+    """Queue every image referenced by attractions and festivals for variant rendering."""
+    sources = []
+    for a in mongo.db.attractions.find({}, {"images": 1}):
+        sources.extend(image_sources(a))
+    for f in mongo.db.festivals.find({}, {"image": 1}):
+        sources.extend(image_sources(f))
+
+    queued = enqueue(sources, mongo.db.media)
+    return jsonify({"message": "Media ingestion started", "referenced": len(set(sources)), "queued": queued}), 202
+
+
+@media_bp.route("/api/media/status", methods=["GET"])
+@db_deadline("admin")
+@admin_only
+def media_status():
+    counts = {s["_id"]: s["count"] for s in mongo.db.media.aggregate([
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+    ])}
+    failed = list(mongo.db.media.find({"status": "failed"}, {"_id": 0, "source": 1, "error": 1}).limit(20))
+    return jsonify({"counts": counts, "recent_failures": failed}), 200
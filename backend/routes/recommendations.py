@@ -1,11 +1,52 @@
 from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from bson import ObjectId
-from extentions import mongo
+from extentions import mongo, catalog, db_deadline
+from models.media import attach_variants
+from tasks import runner
+import datetime
 
 recommendations_bp = Blueprint("recommendations", __name__)
 
+
+def compute_recommendations(interests):
+    # Case-insensitive category matching
+    regex_list = [{"category": {"$regex": i, "$options": "i"}} for i in interests]
+
+    attractions = list(
+        catalog("attractions").find(
+            {"$or": regex_list},
+            {"name": 1, "category": 1, "images": 1, "description": 1}
+        ).limit(12)
+    )
+
+    for a in attractions:
+        a["_id"] = str(a["_id"])
+    return attractions
+
+
+# Precomputed after a profile update, so the next GET is a single lookup.
+# Cached lists are dropped whenever the attraction catalog changes.
+@runner.task("refresh_recommendations")
+def refresh_recommendations(user_id):
+    user = mongo.db.users.find_one({"_id": ObjectId(user_id)}, {"interests": 1})
+    if not user:
+        mongo.db.recommendations.delete_one({"_id": user_id})
+        return
+    interests = user.get("interests", [])
+    mongo.db.recommendations.update_one(
+        {"_id": user_id},
+        {"$set": {
+            "interests": interests,
+            "recommendations": compute_recommendations(interests) if interests else [],
+            "updated_at": datetime.datetime.utcnow()
+        }},
+        upsert=True
+    )
+
+
 @recommendations_bp.route("/recommendations", methods=["GET"])
+@db_deadline("user")
 @jwt_required()
 def get_recommendations():
     user_id = get_jwt_identity()
@@ -18,18 +59,12 @@ def get_recommendations():
     if not interests:
         return jsonify({"recommendations": []})
 
-    # Case-insensitive category matching
-    regex_list = [{"category": {"$regex": i, "$options": "i"}} for i in interests]
-
-    attractions = list(
-        mongo.db.attractions.find(
-            {"$or": regex_list},
-            {"name": 1, "category": 1, "images": 1, "description": 1}
-        ).limit(12)
-    )
-
-    for a in attractions:
-        a["_id"] = str(a["_id"])
+    cached = mongo.db.recommendations.find_one({"_id": user_id})
+    if cached and cached.get("interests") == interests:
+        attractions = cached["recommendations"]
+    else:
+        attractions = compute_recommendations(interests)
+    attach_variants(attractions, mongo.db.media)
 
     return jsonify({
         "user_interests": interests,
@@ -0,0 +1,129 @@
+import datetime
+import os
+import threading
+import time
+from flask import Blueprint, jsonify, request
+from pymongo import ReturnDocument
+from extentions import mongo, deadline
+from models.media import attach_variants
+from models.search_index import search_index
+from tasks import runner
+
+search_bp = Blueprint("search", __name__)
+
+# How often a worker checks the change log for writes made by other workers
+SEARCH_SYNC_SECONDS = float(os.getenv("SEARCH_SYNC_SECONDS", 5))
+
+PROJECTIONS = {
+    "attraction": {"name": 1, "description": 1, "tags": 1, "category": 1, "images": 1},
+    "festival": {"name": 1, "location": 1, "date": 1},
+}
+
+_sync_lock = threading.Lock()
+_last_sync = float("-inf")
+
+
+# -------------------- CROSS-WORKER SYNC --------------------
+def record_catalog_change(kind, doc_id):
+    """
+    Bump the catalog version and log which document it covers. Every worker
+    process holds its own index; they replay this log in sync_search_index.
+    """
+    meta = mongo.db.meta.find_one_and_update(
+        {"_id": "catalog"},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    mongo.db.catalog_changes.insert_one({
+        "version": meta["version"],
+        "kind": kind,
+        "doc_id": doc_id,
+        "at": datetime.datetime.utcnow(),
+    })
+
+
+def rebuild_search_index():
+    # Read the version first: writes logged after it are replayed by the next sync
+    version = (mongo.db.meta.find_one({"_id": "catalog"}) or {}).get("version", 0)
+    search_index.rebuild(
+        mongo.db.attractions.find({}, PROJECTIONS["attraction"]),
+        mongo.db.festivals.find({}, PROJECTIONS["festival"]),
+        version=version,
+    )
+
+
+@runner.task("sync_search_index", local=True)
+def sync_search_index():
+    """Build this process's index, or apply catalog changes logged since it was built."""
+    with _sync_lock:
+        if not search_index.loaded:
+            rebuild_search_index()
+            return
+        changes = mongo.db.catalog_changes.find(
+            {"version": {"$gt": search_index.version}}
+        ).sort("version", 1)
+        for change in changes:
+            if change["version"] != search_index.version + 1:
+                # a change is missing (pruned or never logged): start over
+                rebuild_search_index()
+                return
+            collection = mongo.db.attractions if change["kind"] == "attraction" else mongo.db.festivals
+            doc = collection.find_one({"_id": change["doc_id"]}, PROJECTIONS[change["kind"]])
+            if doc:
+                search_index.upsert(change["kind"], doc["_id"], doc)
+            else:
+                search_index.remove(change["kind"], change["doc_id"])
+            search_index.version = change["version"]
+
+
+def ensure_search_index():
+    """
+    Make sure the index is built and periodically pick up other workers'
+    writes. Gunicorn workers build it in post_fork; elsewhere (or if that
+    failed) the first search builds it, once, while the others wait.
+    """
+    global _last_sync
+    if not search_index.loaded:
+        sync_search_index()
+    now = time.monotonic()
+    if now - _last_sync > SEARCH_SYNC_SECONDS:
+        _last_sync = now
+        runner.submit("sync_search_index")
+
+
+# -------------------- ROUTES --------------------
+@search_bp.route("/search", methods=["GET"])
+def search():
+    """
+    Ranked search over attractions and festivals.
+    Query params: q (required), type ("attraction" | "festival"), limit (default 10).
+    """
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"error": "Query parameter 'q' is required"}), 400
+
+    kind = request.args.get("type")
+    if kind not in (None, "attraction", "festival"):
+        return jsonify({"error": "type must be 'attraction' or 'festival'"}), 400
+
+    try:
+        limit = max(1, min(int(request.args.get("limit", 10)), 50))
+    except ValueError:
+        return jsonify({"error": "limit must be a number"}), 400
+
+    ensure_search_index()
+    results = search_index.search(q, kind=kind, limit=limit)
+    with deadline("catalog"):
+        attach_variants(results, mongo.db.media)
+    return jsonify({"query": q, "results": results}), 200
+
+
+@search_bp.route("/search/autocomplete", methods=["GET"])
+def autocomplete():
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"suggestions": []}), 200
+
+    ensure_search_index()
+    return jsonify({"suggestions": search_index.autocomplete(q)}), 200
@@ -0,0 +1,387 @@
+# tasks.py
+"""
+In-process background tasks for work that should not block a response.
+
+    from tasks import runner
+
+    @runner.task("refresh_catalog_entry")
+    def refresh_catalog_entry(kind, doc_id):
+        ...
+
+    runner.submit("refresh_catalog_entry", "attraction", doc_id)
+
+Tasks are referenced by name so they can be persisted and replayed (unless
+registered with `local=True`, for work tied to this process). Identical
+pending tasks (same name and arguments) are deduplicated, failures are retried
+with exponential backoff, and the queue is bounded: when it is full the task
+runs inline in the caller instead of being dropped, and is still retried.
+Threads start lazily in each process, so this is safe with gunicorn's
+preload_app + fork.
+"""
+import atexit
+import datetime
+import os
+import queue
+import socket
+import threading
+import time
+import traceback
+import uuid
+
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", 4))
+TASK_QUEUE_SIZE = int(os.getenv("TASK_QUEUE_SIZE", 1000))
+TASK_DRAIN_TIMEOUT = float(os.getenv("TASK_DRAIN_TIMEOUT", 20))
+TASK_LEASE_SECONDS = float(os.getenv("TASK_LEASE_SECONDS", 60))
+
+_STOP = object()
+
+
+class TaskBackend:
+    """Durable store for queued tasks. The default runner keeps nothing on disk."""
+
+    def save(self, task):
+        pass
+
+    def ack(self, task_id):
+        pass
+
+    def fail(self, task_id, error):
+        pass
+
+    def retry(self, task_id, attempt):
+        pass
+
+    def heartbeat(self, owner):
+        """Renew `owner`'s lease; its tasks are not claimable while the lease holds."""
+        pass
+
+    def release(self, owner):
+        pass
+
+    def claim_stale(self, owner, names):
+        """
+        Tasks named in `names` whose owner's lease expired; returned tasks now
+        belong to `owner`. Tasks other pools registered are left for them.
+        """
+        return []
+
+
+class MongoTaskBackend(TaskBackend):
+    """Keeps queued tasks in a MongoDB collection so they survive a restart."""
+
+    def __init__(self, collection, lease_seconds=TASK_LEASE_SECONDS):
+        self.collection = collection
+        self.owners = collection.database[f"{collection.name}_owners"]
+        self.lease_seconds = lease_seconds
+
+    def save(self, task):
+        self.collection.insert_one({
+            "_id": task["id"],
+            "name": task["name"],
+            "args": list(task["args"]),
+            "kwargs": task["kwargs"],
+            "status": "queued",
+            "owner": task["owner"],
+            "updated_at": datetime.datetime.utcnow(),
+        })
+
+    def ack(self, task_id):
+        self.collection.delete_one({"_id": task_id})
+
+    def fail(self, task_id, error):
+        self.collection.update_one(
+            {"_id": task_id},
+            {"$set": {"status": "failed", "error": error, "updated_at": datetime.datetime.utcnow()}}
+        )
+
+    def retry(self, task_id, attempt):
+        self.collection.update_one(
+            {"_id": task_id},
+            {"$set": {"attempt": attempt, "updated_at": datetime.datetime.utcnow()}}
+        )
+
+    def heartbeat(self, owner):
+        self.owners.update_one(
+            {"_id": owner},
+            {"$set": {"expires_at": datetime.datetime.utcnow() + datetime.timedelta(seconds=self.lease_seconds)}},
+            upsert=True
+        )
+
+    def release(self, owner):
+        self.owners.delete_one({"_id": owner})
+
+    def claim_stale(self, owner, names):
+        live = self.owners.distinct("_id", {"expires_at": {"$gte": datetime.datetime.utcnow()}})
+        claimed = []
+        while True:
+            doc = self.collection.find_one_and_update(
+                {"status": "queued", "owner": {"$nin": live + [owner]}, "name": {"$in": list(names)}},
+                {"$set": {"owner": owner, "updated_at": datetime.datetime.utcnow()}},
+            )
+            if doc is None:
+                return claimed
+            claimed.append(doc)
+
+
+class TaskRunner:
+    def __init__(self, workers=TASK_WORKERS, queue_size=TASK_QUEUE_SIZE, backend=None):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.backend = backend or TaskBackend()
+        self._registry = {}           # name -> (func, options)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._reset()
+
+    def _reset(self):
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._pending = set()         # dedupe keys of tasks waiting to run (queued or retry scheduled)
+        self._running = 0
+        self._threads = []
+        self._accepting = True
+        self._stats = {
+            "submitted": 0, "deduplicated": 0, "ran_inline": 0, "completed": 0,
+            "failed": 0, "retried": 0, "replayed": 0,
+            "wait_ms_total": 0.0, "run_ms_total": 0.0,
+        }
+
+    # ---------------- registration ----------------
+    def task(self, name, retries=3, backoff=0.5, local=False):
+        """
+        Register a function as a task. `local=True` tasks only make sense in
+        the submitting process, so they are never persisted and never replayed
+        elsewhere.
+        """
+        def decorator(func):
+            self._registry[name] = (func, {"retries": retries, "backoff": backoff, "local": local})
+            return func
+        return decorator
+
+    # ---------------- lifecycle ----------------
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Fresh state per process: threads do not survive a fork
+            self._reset()
+            self._pid = os.getpid()
+            for i in range(self.workers):
+                t = threading.Thread(target=self._work, name=f"task-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+            # Hold a lease before any task is saved, so none look abandoned
+            self._backend_call("heartbeat", self._owner())
+            threading.Thread(target=self._keep_lease, name="task-lease", daemon=True).start()
+
+    def _keep_lease(self):
+        """Renew this process's lease and pick up tasks from processes whose lease lapsed."""
+        pid = os.getpid()
+        while self._pid == pid and self._accepting:
+            self._replay()
+            time.sleep(TASK_LEASE_SECONDS / 3)
+            self._backend_call("heartbeat", self._owner())
+
+    def _replay(self):
+        try:
+            names = [name for name, (_, options) in self._registry.items() if not options["local"]]
+            stale = self.backend.claim_stale(self._owner(), names)
+        except Exception as e:
+            print("❌ Could not replay background tasks:", e)
+            return
+        for doc in stale:
+            args, kwargs = tuple(doc.get("args", [])), doc.get("kwargs", {})
+            task = {
+                "id": doc["_id"], "name": doc["name"], "args": args, "kwargs": kwargs,
+                "attempt": 0, "owner": self._owner(), "queued_at": time.perf_counter(),
+                "key": self._key(doc["name"], args, kwargs),
+            }
+            with self._lock:
+                duplicate = task["key"] in self._pending
+                if not duplicate:
+                    self._stats["replayed"] += 1
+                    self._pending.add(task["key"])
+            if duplicate:
+                self._backend_call("ack", task["id"])
+                continue
+            if not self._enqueue(task, persist=False):
+                self._run(task)
+
+    def shutdown(self, timeout=TASK_DRAIN_TIMEOUT):
+        """Stop accepting tasks and let the queue drain for up to `timeout` seconds."""
+        if self._pid != os.getpid():
+            return True
+        self._accepting = False
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._pending and not self._running:
+                    break
+            time.sleep(0.05)
+        drained = not self._pending and not self._running
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(_STOP)
+            except queue.Full:
+                break
+        # Anything left over becomes claimable by other processes right away
+        self._backend_call("release", self._owner())
+        self._pid = None
+        return drained
+
+    # ---------------- submission ----------------
+    @staticmethod
+    def _key(name, args, kwargs):
+        return (name, repr(tuple(args)), repr(sorted(kwargs.items())))
+
+    def _owner(self):
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def submit(self, name, *args, **kwargs):
+        """
+        Queue a registered task. Returns "queued", "deduplicated" or "inline"
+        (queue full or shutting down: the task ran in the caller).
+        """
+        if name not in self._registry:
+            raise KeyError(f"Unknown task {name!r}")
+        self._ensure_started()
+
+        key = self._key(name, args, kwargs)
+        with self._lock:
+            if key in self._pending:
+                self._stats["deduplicated"] += 1
+                return "deduplicated"
+            self._pending.add(key)
+            self._stats["submitted"] += 1
+
+        task = {
+            "id": uuid.uuid4().hex, "name": name, "args": args, "kwargs": kwargs,
+            "attempt": 0, "owner": self._owner(), "queued_at": time.perf_counter(), "key": key,
+        }
+        persist = not self._registry[name][1]["local"]
+        if not self._accepting or not self._enqueue(task, persist=persist):
+            with self._lock:
+                self._stats["ran_inline"] += 1
+            if not self._accepting and persist:
+                # stored first, so a failure here is left queued for another process
+                self._backend_call("save", task)
+            self._run(task)
+            return "inline"
+        return "queued"
+
+    def _enqueue(self, task, persist=True):
+        if persist:
+            try:
+                self.backend.save(task)
+            except Exception as e:
+                print(f"❌ Could not persist task {task['name']}:", e)
+        try:
+            self._queue.put_nowait(task)
+            return True
+        except queue.Full:
+            return False
+
+    # ---------------- execution ----------------
+    def _work(self):
+        while True:
+            task = self._queue.get()
+            if task is _STOP:
+                return
+            self._run(task)
+
+    def _run(self, task):
+        func, options = self._registry[task["name"]]
+        # Once a task starts it is no longer pending: a submit from here on must
+        # queue a fresh run, since this one may already have read stale data
+        with self._lock:
+            self._pending.discard(task["key"])
+            self._running += 1
+        started = time.perf_counter()
+        try:
+            return self._execute(task, func, options, started)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _execute(self, task, func, options, started):
+        try:
+            result = func(*task["args"], **task["kwargs"])
+        except Exception as e:
+            if task["attempt"] < options["retries"] and not self._accepting and not options["local"]:
+                # shutting down: leave it queued for whichever process claims it next
+                task["attempt"] += 1
+                self._backend_call("retry", task["id"], task["attempt"])
+                return None
+            if task["attempt"] < options["retries"]:
+                with self._lock:
+                    superseded = task["key"] in self._pending
+                    if not superseded:
+                        self._pending.add(task["key"])
+                        self._stats["retried"] += 1
+                if superseded:
+                    # an identical task is already queued and will do the work
+                    self._backend_call("ack", task["id"])
+                    return None
+                task["attempt"] += 1
+                self._backend_call("retry", task["id"], task["attempt"])
+                delay = options["backoff"] * (2 ** (task["attempt"] - 1))
+                timer = threading.Timer(delay, self._retry, args=(task,))
+                timer.daemon = True
+                timer.start()
+                return None
+            print(f"❌ Background task {task['name']} failed:", e)
+            traceback.print_exc()
+            with self._lock:
+                self._stats["failed"] += 1
+            self._backend_call("fail", task["id"], str(e))
+            return None
+
+        with self._lock:
+            self._stats["completed"] += 1
+            self._stats["wait_ms_total"] += (started - task["queued_at"]) * 1000
+            self._stats["run_ms_total"] += (time.perf_counter() - started) * 1000
+        self._backend_call("ack", task["id"])
+        return result
+
+    def _retry(self, task):
+        if not self._enqueue(task, persist=False):
+            self._run(task)
+
+    def _backend_call(self, method, *args):
+        try:
+            getattr(self.backend, method)(*args)
+        except Exception as e:
+            print(f"❌ Task backend {method} failed:", e)
+
+    # ---------------- metrics ----------------
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+            pending = len(self._pending)
+            running = self._running
+        completed = stats.pop("completed")
+        wait_total = stats.pop("wait_ms_total")
+        run_total = stats.pop("run_ms_total")
+        return {
+            **stats,
+            "completed": completed,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self.queue_size,
+            "pending": pending,
+            "running": running,
+            "workers": len(self._threads),
+            "avg_wait_ms": round(wait_total / completed, 3) if completed else 0.0,
+            "avg_run_ms": round(run_total / completed, 3) if completed else 0.0,
+        }
+
+
+runner = TaskRunner()
+atexit.register(runner.shutdown)
+
+
+def init_tasks(app):
+    """Pick the durable backend (TASK_BACKEND=mongo) once the database is configured."""
+    if os.getenv("TASK_BACKEND", "memory") == "mongo":
+        from extentions import mongo
+        runner.backend = MongoTaskBackend(mongo.db.background_tasks)
@@ -0,0 +1,56 @@
+import math
+
+from models.itinerary_optimizer import haversine_matrix, optimize_route, route_length
+
+# [lat, lng]
+BENGALURU = [12.9716, 77.5946]
+MYSURU = [12.2958, 76.6394]
+HAMPI = [15.3350, 76.4600]
+BADAMI = [15.9186, 75.6761]
+COORG = [12.3375, 75.8069]
+GOKARNA = [14.5479, 74.3188]
+
+
+def test_haversine_matrix_is_symmetric_with_known_distance():
+    dist = haversine_matrix([BENGALURU, MYSURU])
+    assert dist[0, 0] == 0
+    assert dist[0, 1] == dist[1, 0]
+    assert 125 < dist[0, 1] < 130
+
+
+def test_route_without_start_visits_every_stop_once():
+    coords = [HAMPI, MYSURU, GOKARNA, BADAMI, COORG, BENGALURU]
+    plan = optimize_route(coords)
+
+    assert sorted(plan["order"]) == list(range(len(coords)))
+    assert [stop["index"] for day in plan["days"] for stop in day] == plan["order"]
+    dist = haversine_matrix(coords)
+    assert math.isclose(plan["total_km"], route_length(dist, plan["order"]), abs_tol=0.01)
+    # no worse than visiting the stops in the order given
+    assert plan["total_km"] <= route_length(dist, list(range(len(coords)))) + 0.01
+
+
+def test_route_from_a_start_point_begins_at_the_nearest_stop():
+    coords = [HAMPI, GOKARNA, MYSURU, BADAMI]
+    plan = optimize_route(coords, start=BENGALURU)
+
+    assert sorted(plan["order"]) == list(range(len(coords)))
+    assert plan["order"][0] == 2  # Mysuru is closest to Bengaluru
+    first = plan["days"][0][0]
+    assert first["index"] == 2 and first["travel_hours"] > 0
+    # the distance from the start point is part of the total
+    dist = haversine_matrix([BENGALURU] + coords)
+    assert math.isclose(plan["total_km"], route_length(dist, [0] + [i + 1 for i in plan["order"]]), abs_tol=0.01)
+
+
+def test_days_respect_the_daily_budget():
+    plan = optimize_route([HAMPI, BADAMI, GOKARNA, COORG, MYSURU], visit_hours=3, day_hours=6)
+    for day in plan["days"]:
+        used = sum(stop["travel_hours"] + 3 for stop in day)
+        assert len(day) == 1 or used <= 6
+
+
+def test_empty_and_single_stop_routes():
+    assert optimize_route([]) == {"order": [], "total_km": 0.0, "days": []}
+    plan = optimize_route([HAMPI])
+    assert plan["order"] == [0] and plan["total_km"] == 0.0
@@ -0,0 +1,66 @@
+from models.search_index import SearchIndex, tokenize
+
+
+def test_tokenize_keeps_kannada_words_whole():
+    assert tokenize("ಹಂಪಿ ಮೈಸೂರು") == ["ಹಂಪಿ", "ಮೈಸೂರು"]
+
+
+def test_tokenize_strips_latin_accents():
+    assert tokenize("Mysūru Café") == ["mysuru", "cafe"]
+
+
+def test_kannada_search_does_not_match_other_places():
+    index = SearchIndex()
+    index.upsert("attraction", "mysore", {"name": "ಮೈಸೂರು ಅರಮನೆ"})
+    index.upsert("attraction", "mangalore", {"name": "ಮಂಗಳೂರು"})
+
+    assert [hit["id"] for hit in index.search("ಮೈಸೂರು")] == ["mysore"]
+
+
+def make_index():
+    index = SearchIndex()
+    index.upsert("attraction", "hampi", {
+        "name": "Hampi", "description": "Ruins of the Vijayanagara empire", "tags": ["heritage"],
+    })
+    index.upsert("attraction", "jog", {
+        "name": "Jog Falls", "description": "Tallest plunge waterfall", "tags": ["nature"],
+    })
+    index.upsert("festival", "dasara", {"name": "Mysuru Dasara", "location": "Mysuru"})
+    return index
+
+
+def test_search_ranks_name_matches_and_filters_by_kind():
+    index = make_index()
+    assert [hit["id"] for hit in index.search("hampi")] == ["hampi"]
+    assert index.search("mysuru", kind="attraction") == []
+    assert [hit["id"] for hit in index.search("mysuru", kind="festival")] == ["dasara"]
+
+
+def test_upsert_replaces_the_previous_version():
+    index = make_index()
+    index.upsert("attraction", "jog", {"name": "Gerusoppa Falls", "images": None})
+
+    assert index.search("jog") == []
+    hit, = index.search("gerusoppa")
+    assert hit["id"] == "jog" and hit["images"] == []
+    assert len(index) == 3
+
+
+def test_remove_drops_the_document_and_its_terms():
+    index = make_index()
+    index.remove("attraction", "hampi")
+
+    assert index.search("vijayanagara") == []
+    assert len(index) == 2
+    index.remove("attraction", "hampi")  # removing twice is harmless
+
+
+def test_misspelled_terms_fall_back_to_similar_ones():
+    index = make_index()
+    assert [hit["id"] for hit in index.search("watrfall")] == ["jog"]
+    assert [hit["id"] for hit in index.search("vijaynagara")] == ["hampi"]
+
+
+def test_last_term_matches_as_a_prefix():
+    index = make_index()
+    assert [s["id"] for s in index.autocomplete("herit")] == ["hampi"]
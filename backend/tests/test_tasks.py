@@ -0,0 +1,160 @@
+import threading
+import time
+
+from tasks import TaskBackend, TaskRunner
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class RecordingBackend(TaskBackend):
+    def __init__(self):
+        self.calls = []
+
+    def save(self, task):
+        self.calls.append(("save", task["name"]))
+
+    def ack(self, task_id):
+        self.calls.append(("ack", task_id))
+
+    def claim_stale(self, owner, names):
+        self.calls.append(("claim_stale", sorted(names)))
+        return []
+
+
+def blocking_runner(**kwargs):
+    """A one-thread runner plus a `block` task that holds that thread until released."""
+    runner = TaskRunner(workers=1, **kwargs)
+    started, release = threading.Event(), threading.Event()
+
+    @runner.task("block")
+    def block():
+        started.set()
+        release.wait(5)
+
+    return runner, started, release
+
+
+def test_identical_pending_tasks_are_deduplicated():
+    runner, started, release = blocking_runner()
+    ran = []
+    runner.task("work")(ran.append)
+
+    runner.submit("block")
+    assert started.wait(5)
+    assert runner.submit("work", 1) == "queued"
+    assert runner.submit("work", 1) == "deduplicated"
+    assert runner.submit("work", 2) == "queued"
+
+    release.set()
+    assert runner.shutdown(timeout=5)
+    assert sorted(ran) == [1, 2]
+
+
+def test_task_submitted_while_running_is_queued_again():
+    runner, started, release = blocking_runner()
+    runner.submit("block")
+    assert started.wait(5)
+    # the running `block` task may already have read stale data
+    assert runner.submit("block") == "queued"
+    release.set()
+    assert runner.shutdown(timeout=5)
+    assert runner.metrics()["completed"] == 2
+
+
+def test_failing_task_is_retried_until_it_succeeds():
+    runner = TaskRunner(workers=1)
+    attempts = []
+
+    @runner.task("flaky", retries=3, backoff=0.01)
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("transient")
+
+    runner.submit("flaky")
+    assert wait_for(lambda: runner.metrics()["completed"] == 1)
+    assert len(attempts) == 3
+    assert runner.metrics()["retried"] == 2
+    runner.shutdown(timeout=5)
+
+
+def test_task_gives_up_after_its_retries():
+    runner = TaskRunner(workers=1)
+
+    @runner.task("broken", retries=1, backoff=0.01)
+    def broken():
+        raise RuntimeError("permanent")
+
+    runner.submit("broken")
+    assert wait_for(lambda: runner.metrics()["failed"] == 1)
+    assert runner.metrics()["retried"] == 1
+    runner.shutdown(timeout=5)
+
+
+def test_full_queue_runs_the_task_inline_and_still_retries():
+    runner, started, release = blocking_runner(queue_size=1)
+    callers, attempts = [], []
+
+    @runner.task("work", retries=2, backoff=0.01)
+    def work(n):
+        callers.append(threading.current_thread())
+        attempts.append(n)
+        if n == 2 and attempts.count(2) == 1:
+            raise RuntimeError("transient")
+
+    runner.submit("block")
+    assert started.wait(5)
+    assert runner.submit("work", 1) == "queued"   # fills the queue
+    assert runner.submit("work", 2) == "inline"
+    assert callers == [threading.current_thread()]
+
+    release.set()
+    assert wait_for(lambda: attempts.count(2) == 2)
+    assert runner.shutdown(timeout=5)
+    assert sorted(attempts) == [1, 2, 2]
+
+
+def test_shutdown_drains_the_queue():
+    runner = TaskRunner(workers=2)
+    done = []
+
+    @runner.task("slow")
+    def slow(n):
+        time.sleep(0.02)
+        done.append(n)
+
+    for n in range(10):
+        runner.submit("slow", n)
+    assert runner.shutdown(timeout=5)
+    assert sorted(done) == list(range(10))
+
+
+def test_shutdown_reports_tasks_left_behind():
+    runner, started, release = blocking_runner()
+    runner.submit("block")
+    assert started.wait(5)
+    assert runner.shutdown(timeout=0.1) is False
+    release.set()
+
+
+def test_local_tasks_are_neither_persisted_nor_claimed():
+    backend = RecordingBackend()
+    runner = TaskRunner(workers=1, backend=backend)
+    runner.task("shared")(lambda: None)
+    runner.task("local_only", local=True)(lambda: None)
+
+    runner.submit("shared")
+    runner.submit("local_only")
+    # the lease thread replays right after start
+    assert wait_for(lambda: ("claim_stale", ["shared"]) in backend.calls)
+    assert runner.shutdown(timeout=5)
+
+    assert ("save", "shared") in backend.calls
+    assert ("save", "local_only") not in backend.calls